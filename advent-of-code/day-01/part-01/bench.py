@@ -0,0 +1,75 @@
+"""Benchmarks the regex and numpy calibration engines
+
+Generates a synthetic calibration document and times each engine over it.
+
+    python bench.py --lines 1000000
+
+"""
+
+import random
+import string
+import tempfile
+import time
+from pathlib import Path
+
+import structlog
+import typer
+
+import part1
+import vectorised
+
+APP = typer.Typer()
+LOG = structlog.get_logger()
+
+
+def generate(path: Path, lines: int, line_length: int, seed: int) -> None:
+    rng = random.Random(seed)
+    letters = string.ascii_lowercase
+    with path.open("w") as fp:
+        for _ in range(lines):
+            line = [rng.choice(letters) for _ in range(line_length)]
+            for _ in range(rng.randint(1, 3)):
+                line[rng.randrange(line_length)] = rng.choice(string.digits)
+            fp.write("".join(line))
+            fp.write("\n")
+
+
+def regex_total(path: Path) -> int:
+    with path.open("r") as fp:
+        return sum(part1.calibration_value(line) for line in fp)
+
+
+def numpy_total(path: Path) -> int:
+    return vectorised.calibration_total(vectorised.load(path))
+
+
+@APP.command()
+def main(lines: int = 1_000_000, line_length: int = 40, repeat: int = 3, seed: int = 0):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "calibration"
+        generate(path, lines, line_length, seed)
+        size = path.stat().st_size
+
+        results: dict[str, float] = {}
+        totals: dict[str, int] = {}
+        for name, engine in [("regex", regex_total), ("numpy", numpy_total)]:
+            best = float("inf")
+            for _ in range(repeat):
+                start = time.perf_counter()
+                totals[name] = engine(path)
+                best = min(best, time.perf_counter() - start)
+            results[name] = best
+            LOG.info(
+                "engine",
+                engine=name,
+                seconds=round(best, 4),
+                mb_per_second=round(size / best / 1e6, 1),
+                total=totals[name],
+            )
+
+    assert totals["regex"] == totals["numpy"], totals
+    LOG.info("speedup", speedup=round(results["regex"] / results["numpy"], 1))
+
+
+if __name__ == "__main__":
+    APP()
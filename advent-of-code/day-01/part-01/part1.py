@@ -1,22 +1,80 @@
+import enum
 import re
 import sys
+from pathlib import Path
+from typing import Annotated, Optional
 
+import numpy as np
 import structlog
+import typer
+
+import incremental
+import mmapsum
+import vectorised
+
+APP = typer.Typer()
 
 LOG = structlog.get_logger()
 
 
-def main():
+class Engine(enum.StrEnum):
+    regex = "regex"
+    numpy = "numpy"
+
+
+def calibration_value(line: str) -> int:
+    matches = re.findall(r"[0-9]", line)
+    first = matches[0]
+    last = matches[-1]
+    return int(f"{first}{last}")
+
+
+@APP.command()
+def main(
+    input: Annotated[Optional[Path], typer.Argument()] = None,
+    processes: int = 0,
+    incremental_: Annotated[bool, typer.Option("--incremental")] = False,
+    watch: bool = False,
+    cache: Optional[Path] = None,
+    engine: Engine = Engine.regex,
+):
+    """Sum calibration values from INPUT, or from stdin if no file is given
+
+    With the regex engine files are memory mapped and summed in chunks across a
+    process pool. The numpy engine works on the whole input as a byte array.
+
+    --incremental keeps a per-line cache next to INPUT (or at --cache) and only
+    computes new or changed lines, --watch keeps doing so as INPUT changes.
+
+    """
+    if incremental_ or watch:
+        if input is None:
+            raise typer.BadParameter("--incremental and --watch need an INPUT file")
+        incremental.run(
+            input, calibration_value, "part1", cache_path=cache, watch=watch
+        )
+        return
+
+    if engine == Engine.numpy:
+        if input is not None:
+            data = vectorised.load(input)
+        else:
+            data = np.frombuffer(sys.stdin.buffer.read(), dtype=np.uint8)
+        LOG.info("total", total=vectorised.calibration_total(data))
+        return
+
+    if input is not None:
+        total = mmapsum.sum_file(input, calibration_value, processes=processes)
+        LOG.info("total", total=total)
+        return
+
     numbers: list[int] = []
     for line in sys.stdin:
-        matches = re.findall(r"[0-9]", line)
-        first = matches[0]
-        last = matches[-1]
-        number = int(f"{first}{last}")
+        number = calibration_value(line)
         numbers.append(number)
-        LOG.info((line, matches, number))
+        LOG.info((line, number))
     LOG.info("total", total=sum(numbers))
 
 
 if __name__ == "__main__":
-    main()
+    APP()
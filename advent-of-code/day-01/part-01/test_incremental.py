@@ -0,0 +1,56 @@
+import os
+
+import incremental
+from part1 import calibration_value
+
+
+def fresh_total(path):
+    return sum(
+        calibration_value(line) for line in path.read_text().splitlines() if line
+    )
+
+
+def write(path, text):
+    path.write_text(text)
+    # Make sure a rewrite within the mtime resolution is still seen
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+def check(tmp_path, edits):
+    path = tmp_path / "input"
+    cache = tmp_path / "cache.json"
+    for text in edits:
+        write(path, text)
+        totals = incremental.LineTotals(cache, calibration_value, "part1")
+        totals.update(path)
+        totals.save()
+        assert totals.total == fresh_total(path), text
+
+
+def test_appends(tmp_path):
+    check(tmp_path, ["1abc2\n", "1abc2\npqr3stu8vwx\n", "1abc2\npqr3stu8vwx\n7"])
+
+
+def test_same_size_edit_of_earlier_line(tmp_path):
+    check(tmp_path, ["1abc2\npqr3stu8vwx\n", "9abc2\npqr3stu8vwx\n"])
+
+
+def test_edit_and_append(tmp_path):
+    check(tmp_path, ["1abc2\npqr3stu8vwx\n", "9abc2\npqr3stu8vwx\na1b2c3d4e5f\n"])
+
+
+def test_truncation(tmp_path):
+    check(tmp_path, ["1abc2\npqr3stu8vwx\na1b2c3d4e5f\n", "1abc2\n", ""])
+
+
+def test_cache_from_another_solver_is_discarded(tmp_path):
+    path = tmp_path / "input"
+    cache = tmp_path / "cache.json"
+    write(path, "1abc2\n")
+    totals = incremental.LineTotals(cache, lambda line: 1000, "part2")
+    totals.update(path)
+    totals.save()
+    totals = incremental.LineTotals(cache, calibration_value, "part1")
+    totals.update(path)
+    assert totals.total == 12
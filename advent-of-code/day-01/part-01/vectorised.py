@@ -0,0 +1,57 @@
+"""Vectorised calibration totals
+
+Treats the whole input as a uint8 array and finds the first and last ASCII
+digit of every line in bulk from where they sit relative to the newlines, so
+there's no Python level loop over lines.
+
+"""
+
+from pathlib import Path
+
+import numpy as np
+
+NEWLINE = ord("\n")
+ZERO = ord("0")
+NINE = ord("9")
+
+
+def load(path: Path) -> np.ndarray:
+    if path.stat().st_size == 0:
+        return np.zeros(0, dtype=np.uint8)
+    return np.memmap(path, dtype=np.uint8, mode="r")
+
+
+def calibration_total(data: np.ndarray) -> int:
+    # Keep only the newlines and digits, in order. The first digit of a line
+    # is then any digit straight after a newline (or the start) and the last
+    # digit is any digit straight before a newline (or the end). Lines
+    # without digits are just consecutive newlines and drop out.
+    keep = (data == NEWLINE) | ((data - ZERO) <= (NINE - ZERO))
+    chars = data[np.flatnonzero(keep)]
+    if len(chars) == 0:
+        return 0
+    is_newline = chars == NEWLINE
+    is_digit = ~is_newline
+
+    firsts = np.empty_like(is_digit)
+    firsts[0] = is_digit[0]
+    np.logical_and(is_digit[1:], is_newline[:-1], out=firsts[1:])
+    lasts = np.empty_like(is_digit)
+    lasts[-1] = is_digit[-1]
+    np.logical_and(is_digit[:-1], is_newline[1:], out=lasts[:-1])
+
+    # Every line with digits has exactly one first and one last, so the
+    # total is just 10 * sum(first digits) + sum(last digits).
+    first_total = int(chars[firsts].sum(dtype=np.int64)) - ZERO * int(firsts.sum())
+    last_total = int(chars[lasts].sum(dtype=np.int64)) - ZERO * int(lasts.sum())
+    return first_total * 10 + last_total
+
+
+EXAMPLE = b"""1abc2
+pqr3stu8vwx
+a1b2c3d4e5f
+treb7uchet"""
+
+assert calibration_total(np.frombuffer(EXAMPLE, dtype=np.uint8)) == 142
+assert calibration_total(np.frombuffer(EXAMPLE + b"\n\n", dtype=np.uint8)) == 142
+assert calibration_total(np.zeros(0, dtype=np.uint8)) == 0
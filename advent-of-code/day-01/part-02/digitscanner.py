@@ -0,0 +1,106 @@
+"""Aho-Corasick scanner for spelled out digits
+
+Compiles a set of words into a DFA so a line can be scanned one character at a
+time, finding overlapping matches like "oneight" without backtracking.
+
+The forward automaton finds the first match in a line and the reversed
+automaton (built from the reversed words) finds the last match by walking the
+line from the end, so both stop as soon as they hit something.
+
+"""
+
+from collections import deque
+from typing import Iterable
+
+
+class Automaton:
+    def __init__(self, words: Iterable[str]):
+        self.words = list(words)
+        self.alphabet = set("".join(self.words))
+        # transitions[state][char] -> state, missing chars go back to the root
+        self.transitions: list[dict[str, int]] = [{}]
+        # words ending at each state, longest first (i.e. earliest start first)
+        self.outputs: list[list[str]] = [[]]
+        for word in self.words:
+            self._add_word(word)
+        self._build()
+
+    def _add_word(self, word: str) -> None:
+        state = 0
+        for char in word:
+            next_state = self.transitions[state].get(char)
+            if next_state is None:
+                next_state = len(self.transitions)
+                self.transitions.append({})
+                self.outputs.append([])
+                self.transitions[state][char] = next_state
+            state = next_state
+        self.outputs[state].append(word)
+
+    def _build(self) -> None:
+        """Fill in failure transitions so every state has a full DFA row"""
+        fail = [0] * len(self.transitions)
+        queue: deque[int] = deque()
+        for char in self.alphabet:
+            next_state = self.transitions[0].get(char)
+            if next_state is None:
+                self.transitions[0][char] = 0
+            else:
+                queue.append(next_state)
+        while queue:
+            state = queue.popleft()
+            self.outputs[state].extend(self.outputs[fail[state]])
+            for char in self.alphabet:
+                next_state = self.transitions[state].get(char)
+                fallback = self.transitions[fail[state]][char]
+                if next_state is None:
+                    self.transitions[state][char] = fallback
+                else:
+                    fail[next_state] = fallback
+                    queue.append(next_state)
+
+    def iter_matches(self, s: str) -> Iterable[str]:
+        transitions = self.transitions
+        outputs = self.outputs
+        state = 0
+        for char in s:
+            state = transitions[state].get(char, 0)
+            yield from outputs[state]
+
+    def first_match(self, s: Iterable[str]) -> str | None:
+        transitions = self.transitions
+        outputs = self.outputs
+        state = 0
+        for char in s:
+            state = transitions[state].get(char, 0)
+            if outputs[state]:
+                return outputs[state][0]
+        return None
+
+
+class DigitScanner:
+    def __init__(self, words: Iterable[str]):
+        words = list(words)
+        self.forward = Automaton(words)
+        self.backward = Automaton(word[::-1] for word in words)
+
+    def matches(self, s: str) -> list[str]:
+        return list(self.forward.iter_matches(s))
+
+    def first(self, s: str) -> str | None:
+        return self.forward.first_match(s)
+
+    def last(self, s: str) -> str | None:
+        match = self.backward.first_match(reversed(s))
+        if match is None:
+            return None
+        return match[::-1]
+
+
+EXAMPLE_SCANNER = DigitScanner(["one", "eight", "two", "1"])
+
+assert EXAMPLE_SCANNER.matches("oneight") == ["one", "eight"]
+assert EXAMPLE_SCANNER.first("xtwone1") == "two"
+assert EXAMPLE_SCANNER.last("xtwone1") == "1"
+assert EXAMPLE_SCANNER.last("twoneightx") == "eight"
+assert EXAMPLE_SCANNER.first("xyz") is None
@@ -0,0 +1,222 @@
+"""Incremental per-line totals
+
+Keeps a persistent cache of line values keyed by a hash of the line content,
+along with the hash of every line in the file, so re-running over a file only
+computes values for new or changed lines and adjusts the total by the
+difference.
+
+Appending is the common case, so if the file hasn't shrunk and a digest of
+the bytes previously read still matches, only the lines from the previous last
+line onwards are decoded and hashed. Any other change falls back to hashing
+every line. Either way values are only computed for lines whose hash changed,
+but checking the digest means every update still reads and hashes the whole
+previous contents, so an update costs time in proportion to the file's size
+rather than to the number of changed lines.
+
+The cache records which solver filled it, and is thrown away if a different
+one picks it up.
+
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Callable, TypedDict
+
+import structlog
+
+LOG = structlog.get_logger()
+
+LineValue = Callable[[str], int]
+
+
+class CacheState(TypedDict):
+    solver: str
+    total: int
+    size: int
+    mtime_ns: int
+    last_line_offset: int
+    prefix_digest: str
+    hashes: list[str]
+    values: dict[str, int]
+
+
+class Change(TypedDict):
+    line_number: int
+    line: str
+    value: int
+
+
+def line_hash(line: str) -> str:
+    return hashlib.blake2b(line.encode(), digest_size=12).hexdigest()
+
+
+def prefix_hasher():
+    return hashlib.blake2b(digest_size=16)
+
+
+def default_cache_path(input: Path, solver: str) -> Path:
+    return input.with_name(f"{input.name}.{solver}.cache.json")
+
+
+class LineTotals:
+    def __init__(self, cache_path: Path, line_value: LineValue, solver: str):
+        self.cache_path = cache_path
+        self.line_value = line_value
+        self.solver = solver
+        self.total = 0
+        # Bytes of the file already accounted for and where its last line
+        # starts, used to spot appends.
+        self.size = 0
+        self.mtime_ns = 0
+        self.last_line_offset = 0
+        # Digest of the first self.size bytes, to check they're unchanged
+        self.prefix_digest = prefix_hasher().hexdigest()
+        self.hashes: list[str] = []
+        self.values: dict[str, int] = {}
+        if cache_path.exists():
+            state: CacheState = json.loads(cache_path.read_text())
+            if state.get("solver") != solver:
+                LOG.warning(
+                    "discarding cache from another solver",
+                    cache=str(cache_path),
+                    solver=state.get("solver"),
+                    expected=solver,
+                )
+                return
+            self.total = state["total"]
+            self.size = state["size"]
+            self.mtime_ns = state["mtime_ns"]
+            self.last_line_offset = state["last_line_offset"]
+            self.prefix_digest = state["prefix_digest"]
+            self.hashes = state["hashes"]
+            self.values = state["values"]
+
+    def save(self) -> None:
+        state: CacheState = {
+            "solver": self.solver,
+            "total": self.total,
+            "size": self.size,
+            "mtime_ns": self.mtime_ns,
+            "last_line_offset": self.last_line_offset,
+            "prefix_digest": self.prefix_digest,
+            "hashes": self.hashes,
+            "values": self.values,
+        }
+        tmp = self.cache_path.with_name(f"{self.cache_path.name}.tmp")
+        tmp.write_text(json.dumps(state))
+        os.replace(tmp, self.cache_path)
+
+    def _value(self, line: str, digest: str) -> int:
+        try:
+            return self.values[digest]
+        except KeyError:
+            value = self.line_value(line) if line.strip() else 0
+            self.values[digest] = value
+            return value
+
+    def _append_hasher(self, fp, size: int):
+        """A prefix hasher fed up to the previous last line
+
+        None if the bytes read last time have changed, as then every line
+        needs re-hashing.
+
+        """
+        if not self.hashes or size < self.size:
+            return None
+        hasher = prefix_hasher()
+        fp.seek(0)
+        remaining = self.last_line_offset
+        while remaining:
+            block = fp.read(min(remaining, 1 << 20))
+            if not block:
+                return None
+            hasher.update(block)
+            remaining -= len(block)
+        check = hasher.copy()
+        check.update(fp.read(self.size - self.last_line_offset))
+        if check.hexdigest() != self.prefix_digest:
+            return None
+        return hasher
+
+    def update(self, path: Path) -> list[Change]:
+        changes: list[Change] = []
+        with path.open("rb") as fp:
+            stat = os.fstat(fp.fileno())
+            if (stat.st_size, stat.st_mtime_ns) == (self.size, self.mtime_ns):
+                return changes
+            hasher = self._append_hasher(fp, stat.st_size)
+            appended = hasher is not None
+            if appended:
+                # Re-read the previous last line as it may have been missing
+                # its newline or been partially written.
+                index = len(self.hashes) - 1
+                offset = self.last_line_offset
+            else:
+                hasher = prefix_hasher()
+                index = 0
+                offset = 0
+            fp.seek(offset)
+            for raw in fp:
+                self.last_line_offset = offset
+                offset += len(raw)
+                hasher.update(raw)
+                line = raw.decode().rstrip("\n")
+                digest = line_hash(line)
+                if index < len(self.hashes):
+                    previous = self.hashes[index]
+                    if previous == digest:
+                        index += 1
+                        continue
+                    self.total -= self.values[previous]
+                    self.hashes[index] = digest
+                else:
+                    self.hashes.append(digest)
+                value = self._value(line, digest)
+                self.total += value
+                changes.append({"line_number": index + 1, "line": line, "value": value})
+                index += 1
+
+        # Lines removed from the end
+        for previous in self.hashes[index:]:
+            self.total -= self.values[previous]
+        del self.hashes[index:]
+        if not self.hashes:
+            self.last_line_offset = 0
+        self.size = offset
+        self.prefix_digest = hasher.hexdigest()
+        self.mtime_ns = stat.st_mtime_ns
+        if not appended:
+            # Drop values no line refers to anymore
+            live = set(self.hashes)
+            self.values = {k: v for k, v in self.values.items() if k in live}
+        return changes
+
+
+def run(
+    input: Path,
+    line_value: LineValue,
+    solver: str,
+    cache_path: Path | None = None,
+    watch: bool = False,
+    interval: float = 1.0,
+) -> int:
+    """solver names line_value, so caches aren't shared between solvers"""
+    totals = LineTotals(
+        cache_path or default_cache_path(input, solver), line_value, solver
+    )
+    last_stat: tuple[int, int] | None = None
+    while True:
+        stat = input.stat()
+        if (stat.st_size, stat.st_mtime_ns) != last_stat:
+            last_stat = (stat.st_size, stat.st_mtime_ns)
+            changes = totals.update(input)
+            for change in changes:
+                LOG.info("line", **change)
+            totals.save()
+            LOG.info("total", total=totals.total, changed=len(changes))
+        if not watch:
+            return totals.total
+        time.sleep(interval)
@@ -0,0 +1,70 @@
+"""Sums a value per line of a file across processes
+
+Memory maps the input, splits it into chunks on newline boundaries and sums
+each chunk in a process pool. Workers map the file themselves and only send
+back their partial totals, so memory stays flat regardless of input size.
+
+"""
+
+import math
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable
+
+CHUNK_SIZE = 16 * 1024 * 1024
+
+LineValue = Callable[[str], int]
+
+
+def chunk_boundaries(mm: mmap.mmap, chunk_size: int) -> list[tuple[int, int]]:
+    boundaries: list[tuple[int, int]] = []
+    size = len(mm)
+    start = 0
+    while start < size:
+        end = mm.find(b"\n", start + chunk_size - 1)
+        end = size if end == -1 else end + 1
+        boundaries.append((start, end))
+        start = end
+    return boundaries
+
+
+def sum_chunk(path: Path, start: int, end: int, line_value: LineValue) -> int:
+    total = 0
+    with path.open("rb") as fp:
+        with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            position = start
+            while position < end:
+                newline = mm.find(b"\n", position, end)
+                if newline == -1:
+                    newline = end
+                line = mm[position:newline].decode()
+                if line.strip():
+                    total += line_value(line)
+                position = newline + 1
+    return total
+
+
+def sum_file(
+    path: Path,
+    line_value: LineValue,
+    processes: int | None = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> int:
+    processes = processes or os.cpu_count() or 1
+    with path.open("rb") as fp:
+        size = os.fstat(fp.fileno()).st_size
+        if size == 0:
+            return 0
+        # Make sure there's at least one chunk per process on smaller inputs
+        chunk_size = max(1, min(chunk_size, math.ceil(size / processes)))
+        with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            boundaries = chunk_boundaries(mm, chunk_size)
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = [
+            executor.submit(sum_chunk, path, start, end, line_value)
+            for start, end in boundaries
+        ]
+        return sum(future.result() for future in futures)
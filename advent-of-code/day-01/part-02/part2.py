@@ -1,7 +1,15 @@
-import re
 import sys
+from pathlib import Path
+from typing import Annotated, Optional
 
 import structlog
+import typer
+
+import digitscanner
+import incremental
+import mmapsum
+
+APP = typer.Typer()
 
 LOG = structlog.get_logger()
 
@@ -20,34 +28,70 @@ LOOKUP = {
 }
 
 
+SCANNER = digitscanner.DigitScanner([*LOOKUP, *"0123456789"])
+
+
 def get_matches(s: str) -> list[str]:
-    return [
-        x
-        for x in re.findall(
-            r"(?=([0-9]|one|two|three|four|five|six|seven|eight|nine|zero))",  # find overlapping matches, see https://stackoverflow.com/questions/11430863/how-to-find-overlapping-matches-with-a-regexp
-            # r"([0-9]|one|two|three|four|five|six|seven|eight|nine|zero)",
-            s,
+    return SCANNER.matches(s)
+
+
+def get_first_and_last(s: str) -> tuple[str, str]:
+    first = SCANNER.first(s)
+    last = SCANNER.last(s)
+    assert first is not None and last is not None, s
+    return first, last
+
+
+def calibration_value(line: str) -> int:
+    first_match, last_match = get_first_and_last(line)
+    first = LOOKUP.get(first_match, first_match)
+    last = LOOKUP.get(last_match, last_match)
+    return int(f"{first}{last}")
+
+
+@APP.command()
+def main(
+    input: Annotated[Optional[Path], typer.Argument()] = None,
+    processes: int = 0,
+    incremental_: Annotated[bool, typer.Option("--incremental")] = False,
+    watch: bool = False,
+    cache: Optional[Path] = None,
+):
+    """Sum calibration values from INPUT, or from stdin if no file is given
+
+    Files are memory mapped and summed in chunks across a process pool.
+
+    --incremental keeps a per-line cache next to INPUT (or at --cache) and only
+    computes new or changed lines, --watch keeps doing so as INPUT changes.
+
+    """
+    assert get_matches("oneight") == ["one", "eight"], get_matches("oneight")
+    if incremental_ or watch:
+        if input is None:
+            raise typer.BadParameter("--incremental and --watch need an INPUT file")
+        incremental.run(
+            input, calibration_value, "part2", cache_path=cache, watch=watch
         )
-        if x
-    ]
+        return
 
+    if input is not None:
+        total = mmapsum.sum_file(input, calibration_value, processes=processes)
+        LOG.info("total", total=total)
+        return
 
-def main():
     numbers: list[int] = []
     for line in sys.stdin:
-        matches = get_matches(line)
-        first = LOOKUP.get(matches[0], matches[0])
-        last = LOOKUP.get(matches[-1], matches[-1])
+        first_match, last_match = get_first_and_last(line)
+        first = LOOKUP.get(first_match, first_match)
+        last = LOOKUP.get(last_match, last_match)
         number = int(f"{first}{last}")
         numbers.append(number)
         LOG.info(
-            (line, matches, (first, last), number),
-            single=len(matches) == 1,
+            (line, (first_match, last_match), (first, last), number),
             equal=(first == last),
         )
     LOG.info("total", total=sum(numbers))
-    assert get_matches("oneight") == ["one", "eight"], get_matches("oneight")
 
 
 if __name__ == "__main__":
-    main()
+    APP()
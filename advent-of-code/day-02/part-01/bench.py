@@ -0,0 +1,69 @@
+"""Benchmarks the parsy and fast game log backends
+
+Generates a synthetic game log and times folding it into colour maxima with
+each backend.
+
+    python bench.py --games 100000
+
+"""
+
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import structlog
+import typer
+
+import gameparser
+
+APP = typer.Typer()
+LOG = structlog.get_logger()
+
+
+def generate(path: Path, games: int, seed: int) -> None:
+    rng = random.Random(seed)
+    colours = list(gameparser.Colour)
+    with path.open("w") as fp:
+        for game in range(1, games + 1):
+            reveals = []
+            for _ in range(rng.randint(1, 6)):
+                drawn = rng.sample(colours, rng.randint(1, len(colours)))
+                reveals.append(", ".join(f"{rng.randint(1, 20)} {c}" for c in drawn))
+            fp.write(f"Game {game}: {'; '.join(reveals)}\n")
+
+
+@APP.command()
+def main(games: int = 100_000, repeat: int = 3, seed: int = 0):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "games"
+        generate(path, games, seed)
+        size = path.stat().st_size
+
+        results: dict[str, float] = {}
+        outputs: dict[str, list[gameparser.GameMaxima]] = {}
+        for backend in gameparser.Backend:
+            best = float("inf")
+            for _ in range(repeat):
+                start = time.perf_counter()
+                with path.open("r") as fp:
+                    outputs[backend] = list(
+                        gameparser.iter_game_maxima(fp, backend=backend)
+                    )
+                best = min(best, time.perf_counter() - start)
+            results[backend] = best
+            LOG.info(
+                "backend",
+                backend=str(backend),
+                seconds=round(best, 4),
+                games_per_second=round(games / best),
+                mb_per_second=round(size / best / 1e6, 1),
+            )
+
+    assert outputs[gameparser.Backend.parsy] == outputs[gameparser.Backend.fast]
+    speedup = results[gameparser.Backend.parsy] / results[gameparser.Backend.fast]
+    LOG.info("speedup", speedup=round(speedup, 1))
+
+
+if __name__ == "__main__":
+    APP()
@@ -10,6 +10,7 @@ Game 5: 6 red, 1 blue, 3 green; 2 blue, 1 red, 2 green
 """
 
 import enum
+import re
 import typing
 
 import parsy
@@ -31,6 +32,16 @@ class GameRound(typing.TypedDict):
     reveals: list[list[Reveal]]
 
 
+class GameMaxima(typing.TypedDict):
+    game: int
+    maxima: dict[Colour, int]
+
+
+class Backend(enum.StrEnum):
+    parsy = "parsy"
+    fast = "fast"
+
+
 GAME = parsy.string("Game") >> parsy.whitespace >> parsy.regex(r"[0-9]+").map(int)
 
 DRAW = parsy.seq(
@@ -48,3 +59,90 @@ FULL_GAME = GAME_ROUND.sep_by(parsy.string("\n"))
 
 def parse(input: str) -> list[GameRound]:
     return FULL_GAME.parse(input.strip())
+
+
+class LineParseError(ValueError):
+    def __init__(self, line_number: int, line: str, error: Exception):
+        self.line_number = line_number
+        self.line = line
+        self.error = error
+        super().__init__(f"line {line_number}: {error} in {line!r}")
+
+
+def iter_games(lines: typing.Iterable[str]) -> typing.Iterator[GameRound]:
+    """Parse one game per line, e.g. from an open file, without reading it all
+
+    Blank lines are skipped and errors are reported with their line number.
+
+    """
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield GAME_ROUND.parse(line)
+        except parsy.ParseError as e:
+            raise LineParseError(line_number, line, e) from e
+
+
+def game_maxima(game: GameRound) -> GameMaxima:
+    maxima = dict.fromkeys(Colour, 0)
+    for game_round in game["reveals"]:
+        for reveal in game_round:
+            colour = reveal["colour"]
+            maxima[colour] = max(maxima[colour], reveal["count"])
+    return {"game": game["game"], "maxima": maxima}
+
+
+COLOUR_LOOKUP = {colour.value: colour for colour in Colour}
+# The same header GAME accepts
+HEADER = re.compile(r"Game\s+([0-9]+)")
+
+
+def fast_game_maxima(line: str) -> GameMaxima:
+    """Tokenize a game line once and fold it straight into colour maxima
+
+    Skips building the Reveal dicts entirely. It only accepts the exact
+    separators the puzzle uses and raises ValueError or KeyError on anything
+    else.
+
+    """
+    header, separator, body = line.partition(": ")
+    match = HEADER.fullmatch(header)
+    if match is None or not separator:
+        raise ValueError(line)
+    maxima = dict.fromkeys(Colour, 0)
+    for reveal in body.split("; "):
+        for draw in reveal.split(", "):
+            count, _, colour_name = draw.partition(" ")
+            # isdigit alone would let through non-ASCII digits
+            if not (count.isascii() and count.isdigit()):
+                raise ValueError(draw)
+            colour = COLOUR_LOOKUP[colour_name]
+            maxima[colour] = max(maxima[colour], int(count))
+    return {"game": int(match.group(1)), "maxima": maxima}
+
+
+def iter_game_maxima(
+    lines: typing.Iterable[str], backend: Backend = Backend.fast
+) -> typing.Iterator[GameMaxima]:
+    """Per-colour maxima for each game line, without keeping the reveals
+
+    Lines the fast backend can't handle are handed to the parsy parser, so the
+    results and errors match iter_games.
+
+    """
+    if backend == Backend.parsy:
+        yield from (game_maxima(game) for game in iter_games(lines))
+        return
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield fast_game_maxima(line)
+        except (ValueError, KeyError):
+            try:
+                yield game_maxima(GAME_ROUND.parse(line))
+            except parsy.ParseError as e:
+                raise LineParseError(line_number, line, e) from e
@@ -0,0 +1,90 @@
+"""Columnar store of per-game colour maxima
+
+Each game is reduced to its id and the most cubes of each colour seen in any
+reveal, kept as NumPy columns. A game is possible for a bag if every maximum
+fits, so many bag configurations can be checked against the same store in one
+vectorised call without re-parsing.
+
+"""
+
+import typing
+
+import numpy as np
+
+import gameparser
+
+COLOURS = list(gameparser.Colour)
+
+# Upper bound on the size of the (thresholds x games) comparison done at once
+BLOCK_SIZE = 1 << 22
+
+
+class GameStore:
+    def __init__(self, games: np.ndarray, maxima: np.ndarray):
+        # games: (n,) game ids, maxima: (n, len(COLOURS)) indexed like COLOURS
+        self.games = games
+        self.maxima = maxima
+
+    @classmethod
+    def from_maxima(cls, games: typing.Iterable[gameparser.GameMaxima]) -> "GameStore":
+        ids: list[int] = []
+        maxima: list[int] = []
+        for game in games:
+            ids.append(game["game"])
+            maxima.extend(game["maxima"][colour] for colour in COLOURS)
+        return cls(
+            np.array(ids, dtype=np.int64),
+            np.array(maxima, dtype=np.int64).reshape(-1, len(COLOURS)),
+        )
+
+    @classmethod
+    def from_games(cls, games: typing.Iterable[gameparser.GameRound]) -> "GameStore":
+        return cls.from_maxima(gameparser.game_maxima(game) for game in games)
+
+    @classmethod
+    def from_lines(
+        cls,
+        lines: typing.Iterable[str],
+        backend: gameparser.Backend = gameparser.Backend.fast,
+    ) -> "GameStore":
+        return cls.from_maxima(gameparser.iter_game_maxima(lines, backend=backend))
+
+    def __len__(self) -> int:
+        return len(self.games)
+
+    def possible(self, thresholds: np.ndarray) -> np.ndarray:
+        """(k, n) mask of which games fit each (k, len(COLOURS)) threshold"""
+        thresholds = np.asarray(thresholds, dtype=np.int64).reshape(-1, len(COLOURS))
+        return (self.maxima[np.newaxis, :, :] <= thresholds[:, np.newaxis, :]).all(
+            axis=2
+        )
+
+    def game_amounts(self, thresholds: np.ndarray) -> np.ndarray:
+        """Sum of possible game ids for each threshold triple"""
+        thresholds = np.asarray(thresholds, dtype=np.int64).reshape(-1, len(COLOURS))
+        totals = np.zeros(len(thresholds), dtype=np.int64)
+        block = max(1, BLOCK_SIZE // max(1, len(self)))
+        for start in range(0, len(thresholds), block):
+            possible = self.possible(thresholds[start : start + block])
+            totals[start : start + block] = possible @ self.games
+        return totals
+
+    def power(self) -> np.ndarray:
+        """Product of the colour maxima per game, i.e. the part 2 power"""
+        return self.maxima.prod(axis=1)
+
+
+EXAMPLE = """Game 1: 3 blue, 4 red; 1 red, 2 green, 6 blue; 2 green
+Game 2: 1 blue, 2 green; 3 green, 4 blue, 1 red; 1 green, 1 blue
+Game 3: 8 green, 6 blue, 20 red; 5 blue, 4 red, 13 green; 5 green, 1 red
+Game 4: 1 green, 3 red, 6 blue; 3 green, 6 red; 3 green, 15 blue, 14 red
+Game 5: 6 red, 1 blue, 3 green; 2 blue, 1 red, 2 green
+"""
+
+_store = GameStore.from_lines(EXAMPLE.splitlines())
+assert _store.game_amounts([[12, 13, 14], [0, 0, 0], [20, 13, 15]]).tolist() == [
+    8,
+    0,
+    15,
+]
+assert _store.power().tolist() == [48, 12, 1560, 630, 36]
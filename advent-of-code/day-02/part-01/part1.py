@@ -1,10 +1,12 @@
 from pathlib import Path
-from typing import Annotated
+from typing import Annotated, Optional
 
+import numpy as np
 import typer
 import structlog
 
 import gameparser
+import gamestore
 
 APP = typer.Typer()
 
@@ -24,6 +26,15 @@ def get_game_amount(
     return 0
 
 
+def get_game_amount_from_maxima(
+    game: gameparser.GameMaxima, max_possible: dict[gameparser.Colour, int]
+) -> int:
+    for colour, count in game["maxima"].items():
+        if count > max_possible[colour]:
+            return 0
+    return game["game"]
+
+
 @APP.command()
 def main(
     input: Path,
@@ -31,21 +42,42 @@ def main(
     max_red: int = 0,
     max_green: int = 0,
     max_blue: int = 0,
+    thresholds: Optional[Path] = None,
+    backend: Optional[gameparser.Backend] = None,
 ):
-    parsed = gameparser.parse(input.open("r").read())
-    LOG.debug("parsed", parsed=parsed)
+    """Sum the ids of games possible with the given bag
 
-    total = 0
-    for game in parsed:
-        LOG.info(game)
-        total += get_game_amount(
-            game,
-            {
-                gameparser.Colour.red: max_red,
-                gameparser.Colour.blue: max_blue,
-                gameparser.Colour.green: max_green,
-            },
+    --thresholds takes a file of "red green blue" bags, one per line, and
+    checks them all against a single parse of INPUT.
+
+    --backend fast (or parsy) only keeps each game's colour maxima rather than
+    every reveal.
+
+    """
+    if thresholds is not None:
+        store = gamestore.GameStore.from_lines(
+            input.open("r"), backend=backend or gameparser.Backend.fast
         )
+        bags = np.loadtxt(thresholds, dtype=np.int64, ndmin=2)
+        for bag, total in zip(bags, store.game_amounts(bags)):
+            red, green, blue = bag.tolist()
+            LOG.info("bag", red=red, green=green, blue=blue, total=int(total))
+        return
+
+    max_possible = {
+        gameparser.Colour.red: max_red,
+        gameparser.Colour.blue: max_blue,
+        gameparser.Colour.green: max_green,
+    }
+    total = 0
+    if backend is not None:
+        for maxima in gameparser.iter_game_maxima(input.open("r"), backend=backend):
+            LOG.info(maxima)
+            total += get_game_amount_from_maxima(maxima, max_possible)
+    else:
+        for game in gameparser.iter_games(input.open("r")):
+            LOG.info(game)
+            total += get_game_amount(game, max_possible)
     LOG.info("total", total=total)
     if expected > 0 and total != expected:
         LOG.warning("wrong expected total", expected=expected, total=total)
@@ -1,3 +1,6 @@
+import parsy
+import pytest
+
 import gameparser
 
 
@@ -115,3 +118,57 @@ def test_parse_full_game():
             ],
         },
     ]
+
+
+def test_iter_games():
+    lines = iter(["Game 1: 1 red; 2 green\n", "\n", "Game 2: 2 red\n"])
+    assert list(gameparser.iter_games(lines)) == gameparser.parse(
+        "Game 1: 1 red; 2 green\nGame 2: 2 red"
+    )
+
+
+def test_iter_games_reports_line():
+    games = gameparser.iter_games(["Game 1: 1 red", "Game 2: 2 purple"])
+    assert next(games)["game"] == 1
+    with pytest.raises(gameparser.LineParseError) as e:
+        next(games)
+    assert e.value.line_number == 2
+    assert e.value.line == "Game 2: 2 purple"
+
+
+def test_fast_backend_matches_parsy():
+    lines = [
+        "Game 1: 3 blue, 4 red; 1 red, 2 green, 6 blue; 2 green",
+        "Game 1: 1 red; 2 green",
+        "Game 2: 2 red",
+        "Game 12: 8  green, 6 blue; 20 red",
+    ]
+    fast = list(gameparser.iter_game_maxima(lines, backend=gameparser.Backend.fast))
+    slow = list(gameparser.iter_game_maxima(lines, backend=gameparser.Backend.parsy))
+    assert fast == slow
+    assert fast[0] == {
+        "game": 1,
+        "maxima": {
+            gameparser.Colour.red: 4,
+            gameparser.Colour.green: 2,
+            gameparser.Colour.blue: 6,
+        },
+    }
+
+
+def test_fast_backend_reports_line():
+    games = gameparser.iter_game_maxima(["Game 1: 1 red", "Game 2: 2 purple"])
+    assert next(games)["game"] == 1
+    with pytest.raises(gameparser.LineParseError) as e:
+        next(games)
+    assert e.value.line_number == 2
+    assert isinstance(e.value.error, parsy.ParseError)
+    with pytest.raises(gameparser.LineParseError):
+        list(gameparser.iter_game_maxima(["Game 3:  8 green"]))
+    with pytest.raises(gameparser.LineParseError):
+        list(gameparser.iter_game_maxima(["Game 4: 1 blue,2 red;3 green"]))
+    for line in ["Game 1 : 1 red", "Game \u0661: 1 red", "Game 1: \u0661 red"]:
+        with pytest.raises(gameparser.LineParseError):
+            list(gameparser.iter_game_maxima([line]))
+        with pytest.raises(ValueError):
+            gameparser.fast_game_maxima(line)
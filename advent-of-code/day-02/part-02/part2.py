@@ -1,7 +1,7 @@
 import itertools
 import functools
 from pathlib import Path
-from typing import Annotated
+from typing import Annotated, Optional
 
 import typer
 import structlog
@@ -27,18 +27,28 @@ def get_game_power(game: gameparser.GameRound) -> int:
     return minimums[0] * minimums[1] * minimums[2]
 
 
+def get_game_power_from_maxima(game: gameparser.GameMaxima) -> int:
+    power = 1
+    for count in game["maxima"].values():
+        power *= count
+    return power
+
+
 @APP.command()
 def main(
     input: Path,
     expected: int = -1,
+    backend: Optional[gameparser.Backend] = None,
 ):
-    parsed = gameparser.parse(input.open("r").read())
-    LOG.debug("parsed", parsed=parsed)
-
     total = 0
-    for game in parsed:
-        LOG.info(game)
-        total += get_game_power(game)
+    if backend is not None:
+        for maxima in gameparser.iter_game_maxima(input.open("r"), backend=backend):
+            LOG.info(maxima)
+            total += get_game_power_from_maxima(maxima)
+    else:
+        for game in gameparser.iter_games(input.open("r")):
+            LOG.info(game)
+            total += get_game_power(game)
     LOG.info("total", total=total)
     if expected > 0 and total != expected:
         LOG.warning("wrong expected total", expected=expected, total=total)
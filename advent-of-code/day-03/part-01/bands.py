@@ -0,0 +1,120 @@
+"""Parallel schematic solving in row bands
+
+Splits the schematic file into bands of whole rows and scans each band in a
+process pool with streaming.scan. Every band also reads the row just above
+and just below it as a halo for context, but only reports numbers and gears
+on its own rows, so anything near a band edge is counted exactly once.
+Workers only send back their totals.
+
+"""
+
+import itertools
+import math
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple
+
+import streaming
+
+CHUNK_SIZE = 16 * 1024 * 1024
+
+
+class Totals(NamedTuple):
+    part_numbers: int
+    gear_ratios: int
+
+
+def band_boundaries(mm: mmap.mmap, chunk_size: int) -> list[tuple[int, int]]:
+    boundaries: list[tuple[int, int]] = []
+    size = len(mm)
+    start = 0
+    while start < size:
+        end = mm.find(b"\n", start + chunk_size - 1)
+        end = size if end == -1 else end + 1
+        boundaries.append((start, end))
+        start = end
+    return boundaries
+
+
+def halo_above(mm: mmap.mmap, start: int) -> str | None:
+    """The last non blank row before offset start"""
+    end = start
+    while end > 0:
+        line_start = mm.rfind(b"\n", 0, end - 1) + 1
+        line = mm[line_start:end].strip()
+        if line:
+            return line.decode()
+        end = line_start
+    return None
+
+
+def halo_below(mm: mmap.mmap, end: int) -> str | None:
+    """The first non blank row from offset end"""
+    size = len(mm)
+    while end < size:
+        line_end = mm.find(b"\n", end)
+        line_end = size if line_end == -1 else line_end + 1
+        line = mm[end:line_end].strip()
+        if line:
+            return line.decode()
+        end = line_end
+    return None
+
+
+def band_rows(mm: mmap.mmap, start: int, end: int) -> Iterator[str]:
+    position = start
+    while position < end:
+        newline = mm.find(b"\n", position, end)
+        if newline == -1:
+            newline = end
+        line = mm[position:newline].strip()
+        if line:
+            yield line.decode()
+        position = newline + 1
+
+
+def scan_band(path: Path, start: int, end: int) -> Totals:
+    part_numbers = 0
+    gear_ratios = 0
+    with path.open("rb") as fp:
+        with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            above = halo_above(mm, start)
+            below = halo_below(mm, end)
+            rows: Iterable[str] = band_rows(mm, start, end)
+            if above is not None:
+                rows = itertools.chain([above], rows)
+            if below is not None:
+                rows = itertools.chain(rows, [below])
+            for found in streaming.scan(
+                rows, halo_above=above is not None, halo_below=below is not None
+            ):
+                if found.kind == "part":
+                    part_numbers += found.value
+                else:
+                    gear_ratios += found.value
+    return Totals(part_numbers, gear_ratios)
+
+
+def totals(
+    path: Path, processes: int | None = None, chunk_size: int = CHUNK_SIZE
+) -> Totals:
+    processes = processes or os.cpu_count() or 1
+    with path.open("rb") as fp:
+        size = os.fstat(fp.fileno()).st_size
+        if size == 0:
+            return Totals(0, 0)
+        chunk_size = max(1, min(chunk_size, math.ceil(size / processes)))
+        with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            boundaries = band_boundaries(mm, chunk_size)
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = [
+            executor.submit(scan_band, path, start, end) for start, end in boundaries
+        ]
+        results = [future.result() for future in futures]
+    return Totals(
+        sum(result.part_numbers for result in results),
+        sum(result.gear_ratios for result in results),
+    )
@@ -1,9 +1,13 @@
 from pathlib import Path
+from typing import Annotated
 
 import typer
 import structlog
 
+import bands
+import bulk
 import partsparser
+import streaming
 
 APP = typer.Typer()
 
@@ -11,13 +15,41 @@ LOG = structlog.get_logger()
 
 
 @APP.command()
-def main(input: Path, expected: int = -1):
+def main(
+    input: Path,
+    expected: int = -1,
+    bulk_: Annotated[bool, typer.Option("--bulk")] = False,
+    streaming_: Annotated[bool, typer.Option("--streaming")] = False,
+    parallel: bool = False,
+    processes: int = 0,
+):
+    """Sum the part numbers in INPUT
+
+    --bulk works on the schematic as NumPy arrays, for very large inputs.
+    --streaming reads INPUT a row at a time, for very tall inputs.
+    --parallel streams bands of rows across --processes (default all CPUs).
+
+    """
+    if bulk_ or streaming_ or parallel:
+        if parallel:
+            total = bands.totals(input, processes=processes).part_numbers
+        elif streaming_:
+            total = sum(streaming.part_numbers(streaming.read_rows(input.open("r"))))
+        else:
+            chars = bulk.load_file(input)
+            labels, values = bulk.label_numbers(chars)
+            total = int(bulk.part_numbers(chars, labels, values).sum())
+        LOG.info("total", total=total)
+        if expected > 0 and expected != total:
+            LOG.warning("Total incorrect", total=total, expected=expected)
+        return
+
     grid = partsparser.parts_parser(
         input=(line.strip() for line in input.open("r").readlines() if line.strip())
     )
     LOG.info("parsed", grid=grid)
 
-    for y, row in grid.squares.items():
+    for y, row in enumerate(grid.rows()):
         print((y, row))
 
     part_numbers = []
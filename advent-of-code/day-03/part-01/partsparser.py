@@ -1,79 +1,294 @@
-from collections import defaultdict
-from dataclasses import dataclass
-from functools import cached_property
+"""Parses engine schematics
+
+The grid is stored densely, row by row, as a few flat arrays with one entry
+per cell:
+
+- chars: the raw schematic bytes
+- kinds: a Kind byte per cell
+- labels: the index into Grid.numbers of the Number covering the cell, or
+  NO_NUMBER
+- flags: PROCESSING / MATCHED bits used when stepping through a solution,
+  with changed cells collected in Grid.dirty
+
+So a cell costs a handful of bytes rather than an object, and neighbours are
+index arithmetic. Empty, Digit and Part are small views of a single cell which
+are created on demand and read and write through to the grid.
+
+Which numbers touch which parts is worked out once when parsing and kept as
+an inverted index in both directions (Grid.part_labels, Grid.number_parts),
+with parts also grouped by symbol and by how many numbers they touch. Queries
+like Grid.numbers_adjacent_to or Grid.parts_with_adjacent_count are then
+lookups rather than walks over the grid.
+
+"""
+
+import array
+import enum
 import re
+from dataclasses import dataclass, field
 from typing import Iterable
 
 import structlog
 
 LOG = structlog.get_logger()
 
+NO_NUMBER = -1
+
+# Bits in Grid.flags
+PROCESSING = 1
+MATCHED = 2
+
+
+class Kind(enum.IntEnum):
+    empty = 0
+    digit = 1
+    part = 2
+
+
+def _kind(byte: int) -> Kind:
+    if ord("0") <= byte <= ord("9"):
+        return Kind.digit
+    if byte == ord("."):
+        return Kind.empty
+    return Kind.part
+
+
+# Translation table from schematic bytes to Kind bytes
+KIND_TABLE = bytes(_kind(byte) for byte in range(256))
+
+NUMBER_RE = re.compile(rb"[0-9]+")
+
 
 @dataclass
-class Digit:
-    digit: str
+class Cell:
+    grid: "Grid" = field(repr=False, compare=False)
     x: int
     y: int
 
+    @property
+    def index(self) -> int:
+        return self.y * self.grid.width + self.x
+
+    def _get_flag(self, flag: int) -> bool:
+        return bool(self.grid.flags[self.index] & flag)
+
+    def _set_flag(self, flag: int, value: bool) -> None:
+        index = self.index
+        flags = self.grid.flags
+        before = flags[index]
+        flags[index] = before | flag if value else before & ~flag
+        if flags[index] != before:
+            self.grid.dirty.add(index)
+
+    @property
+    def processing(self) -> bool:
+        return self._get_flag(PROCESSING)
+
+    @processing.setter
+    def processing(self, value: bool) -> None:
+        self._set_flag(PROCESSING, value)
+
+    @property
+    def matched(self) -> bool:
+        return self._get_flag(MATCHED)
+
+    @matched.setter
+    def matched(self, value: bool) -> None:
+        self._set_flag(MATCHED, value)
+
     def neighbours(self) -> Iterable[tuple[int, int]]:
-        for x_offset in [-1, 0, 1]:
-            for y_offset in [-1, 0, 1]:
-                coord = (self.x + x_offset, self.y + y_offset)
-                if coord != (self.x, self.y):
-                    yield coord
+        for index in self.grid.neighbour_indexes(self.index):
+            yield self.grid.coords(index)
 
 
 @dataclass
-class Number:
-    digits: list[Digit]
+class Empty(Cell):
+    pass
 
-    @cached_property
-    def value(self) -> int:
-        s = "".join(d.digit for d in self.digits)
-        return int(s)
 
-    def neighbours(self) -> Iterable[tuple[int, int]]:
-        selves = set((d.x, d.y) for d in self.digits)
-        coords = set()
-        for d in self.digits:
-            coords.update(d.neighbours())
-        for coord in coords.difference(selves):
-            yield coord
+@dataclass
+class Digit(Cell):
+    @property
+    def digit(self) -> str:
+        return chr(self.grid.chars[self.index])
+
+    @property
+    def number(self) -> "Number":
+        return self.grid.numbers[self.grid.labels[self.index]]
 
 
 @dataclass
-class Part:
-    symbol: str
+class Part(Cell):
+    @property
+    def symbol(self) -> str:
+        return chr(self.grid.chars[self.index])
 
 
-Squares = dict[int, dict[int, Digit | None | Part]]
+Square = Digit | Part | Empty
+
+
+@dataclass
+class Number:
+    grid: "Grid" = field(repr=False, compare=False)
+    label: int
+    x: int
+    y: int
+    length: int
+    value: int
+    processing: bool = False
+
+    @property
+    def index(self) -> int:
+        return self.y * self.grid.width + self.x
+
+    @property
+    def digits(self) -> list[Digit]:
+        return [
+            Digit(self.grid, x, self.y) for x in range(self.x, self.x + self.length)
+        ]
+
+    def neighbour_indexes(self) -> Iterable[int]:
+        width = self.grid.width
+        left = max(self.x - 1, 0)
+        right = min(self.x + self.length, width - 1)
+        start = self.index
+        if self.x > 0:
+            yield start - 1
+        if self.x + self.length < width:
+            yield start + self.length
+        for y in (self.y - 1, self.y + 1):
+            if 0 <= y < self.grid.height:
+                yield from range(y * width + left, y * width + right + 1)
+
+    def neighbours(self) -> Iterable[tuple[int, int]]:
+        for index in self.neighbour_indexes():
+            yield self.grid.coords(index)
+
+    @property
+    def matched(self) -> bool:
+        return all(d.matched for d in self.digits)
+
+    @matched.setter
+    def matched(self, value: bool) -> None:
+        for digit in self.digits:
+            digit.matched = value
 
 
 @dataclass
 class Grid:
-    squares: Squares
+    width: int
+    height: int
+    chars: bytearray = field(repr=False)
+    kinds: bytes = field(repr=False)
+    labels: array.array = field(repr=False)
+    flags: bytearray = field(repr=False)
     numbers: list[Number]
-    width: int = 0
+    parts: list[Part]
+    # Indexes of cells whose flags changed, for redrawing just those
+    dirty: set[int] = field(default_factory=set, repr=False)
+    # Part cell index -> labels of the numbers touching it, in label order
+    part_labels: dict[int, list[int]] = field(default_factory=dict, repr=False)
+    # Number label -> cell indexes of the parts touching it, in cell order
+    number_parts: list[list[int]] = field(default_factory=list, repr=False)
+    # (symbol, count of numbers touching) -> part cell indexes, in cell order
+    part_groups: dict[tuple[str, int], list[int]] = field(
+        default_factory=dict, repr=False
+    )
+
+    def coords(self, index: int) -> tuple[int, int]:
+        y, x = divmod(index, self.width)
+        return x, y
+
+    def square(self, index: int) -> Square:
+        x, y = self.coords(index)
+        match self.kinds[index]:
+            case Kind.digit:
+                return Digit(self, x, y)
+            case Kind.part:
+                return Part(self, x, y)
+            case _:
+                return Empty(self, x, y)
+
+    def rows(self) -> Iterable[str]:
+        for y in range(self.height):
+            yield self.chars[y * self.width : (y + 1) * self.width].decode()
+
+    def neighbour_indexes(self, index: int) -> Iterable[int]:
+        y, x = divmod(index, self.width)
+        left = -1 if x > 0 else 0
+        right = 1 if x < self.width - 1 else 0
+        for row_y in (y - 1, y, y + 1):
+            if 0 <= row_y < self.height:
+                row_start = row_y * self.width + x
+                for i in range(row_start + left, row_start + right + 1):
+                    if i != index:
+                        yield i
+
+    def neighbour_labels(self, index: int) -> list[int]:
+        labels = {self.labels[i] for i in self.neighbour_indexes(index)}
+        labels.discard(NO_NUMBER)
+        return sorted(labels)
+
+    def index_adjacency(self) -> None:
+        """(Re)build the part <-> number index from the current cells"""
+        self.part_labels = {}
+        self.number_parts = [[] for _ in self.numbers]
+        self.part_groups = {}
+        for part in self.parts:
+            index = part.index
+            labels = self.neighbour_labels(index)
+            self.part_labels[index] = labels
+            for label in labels:
+                self.number_parts[label].append(index)
+            key = (part.symbol, len(labels))
+            self.part_groups.setdefault(key, []).append(index)
+
+    def adjacent_numbers(self, square: Cell) -> list[Number]:
+        labels = self.part_labels.get(square.index)
+        if labels is None:
+            labels = self.neighbour_labels(square.index)
+        return [self.numbers[label] for label in labels]
+
+    def adjacent_parts(self, number: Number) -> list[Part]:
+        return [Part(self, *self.coords(i)) for i in self.number_parts[number.label]]
+
+    def numbers_adjacent_to(self, symbols: Iterable[str]) -> list[Number]:
+        """Numbers touching at least one part with any of the symbols"""
+        symbols = set(symbols)
+        labels: set[int] = set()
+        for (symbol, _), indexes in self.part_groups.items():
+            if symbol in symbols:
+                for index in indexes:
+                    labels.update(self.part_labels[index])
+        return [self.numbers[label] for label in sorted(labels)]
+
+    def parts_with_adjacent_count(
+        self, count: int, symbols: Iterable[str] | None = None
+    ) -> list[Part]:
+        """Parts touching exactly count numbers, optionally only these symbols"""
+        if symbols is not None:
+            symbols = set(symbols)
+        indexes: list[int] = []
+        for (symbol, group_count), group in self.part_groups.items():
+            if group_count == count and (symbols is None or symbol in symbols):
+                indexes.extend(group)
+        return [Part(self, *self.coords(i)) for i in sorted(indexes)]
 
     def get_part_numbers(self) -> Iterable[tuple[int, bool]]:
         for number in self.numbers:
-            LOG.info("number", number=number)
-            for x, y in number.neighbours():
-                try:
-                    square = self.squares[x][y]
-                except KeyError:
-                    continue
-                LOG.info("neighbour", x=x, y=y, square=square)
-                is_part = False
-                match square:
-                    case Part():
-                        is_part = True
-                    case _:
-                        continue
-                yield (number.value, is_part)
-
-
-def parts_parser(input: list[str]) -> Grid:
+            yield (number.value, bool(self.number_parts[number.label]))
+
+    def iterate_squares(self) -> Iterable[tuple[int, int, Square]]:
+        for index in range(self.width * self.height):
+            square = self.square(index)
+            yield (square.x, square.y, square)
+
+    def iterate_neighbours(self, square: Cell) -> Iterable[Square]:
+        for index in self.neighbour_indexes(square.index):
+            yield self.square(index)
+
+
+def parts_parser(input: Iterable[str]) -> Grid:
     """
 
     Example:
@@ -92,30 +307,52 @@ def parts_parser(input: list[str]) -> Grid:
     Parse into a grid with digits, dots or symbols.
 
     """
-    grid = Grid(squares=defaultdict(dict), numbers=[])
-    current_number: Number | None = None
-    for y, line in enumerate(input):
-        for x, char in enumerate(line):
-            if re.match(r"[0-9]", char):
-                digit = Digit(digit=char, x=x, y=y)
-                if current_number is None:
-                    current_number = Number(digits=[digit])
-                else:
-                    current_number.digits.append(digit)
-                square = digit
-            elif char == ".":
-                square = None
-                if current_number is not None:
-                    grid.numbers.append(current_number)
-                    current_number = None
-            elif re.match(r"[^0-9.]", char):
-                part = Part(symbol=char)
-                square = part
-                if current_number is not None:
-                    grid.numbers.append(current_number)
-                    current_number = None
-            else:
-                raise NotImplementedError(char)
-
-            grid.squares[x][y] = square
+    chars = bytearray()
+    width: int | None = None
+    height = 0
+    for line in input:
+        row = line.encode()
+        if width is None:
+            width = len(row)
+        elif len(row) != width:
+            raise ValueError(f"row {height} is {len(row)} wide, expected {width}")
+        chars += row
+        height += 1
+    width = width or 0
+
+    grid = Grid(
+        width=width,
+        height=height,
+        chars=chars,
+        kinds=bytes(chars.translate(KIND_TABLE)),
+        labels=array.array("i", [NO_NUMBER]) * len(chars),
+        flags=bytearray(len(chars)),
+        numbers=[],
+        parts=[],
+    )
+    for y in range(height):
+        row_start = y * width
+        row = chars[row_start : row_start + width]
+        for match in NUMBER_RE.finditer(row):
+            label = len(grid.numbers)
+            start, end = match.span()
+            grid.labels[row_start + start : row_start + end] = array.array(
+                "i", [label]
+            ) * (end - start)
+            grid.numbers.append(
+                Number(
+                    grid=grid,
+                    label=label,
+                    x=start,
+                    y=y,
+                    length=end - start,
+                    value=int(match.group()),
+                )
+            )
+    start = 0
+    while (index := grid.kinds.find(bytes([Kind.part]), start)) != -1:
+        grid.parts.append(Part(grid, *grid.coords(index)))
+        start = index + 1
+    grid.index_adjacency()
+
     return grid
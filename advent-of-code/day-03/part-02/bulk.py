@@ -0,0 +1,165 @@
+"""Bulk schematic solving with NumPy
+
+Works on the whole schematic as a 2D uint8 array rather than a Grid:
+
+- numbers are labelled by a cumulative sum over the cells where a run of
+  digits starts, and their values come from one reduceat over the digits
+- part numbers are the labels under the symbol mask dilated by one cell
+- gears are the "*" cells whose 8 neighbours hold exactly two distinct labels
+
+So everything is a handful of array operations and large schematics never
+turn into Python objects per number or per cell.
+
+"""
+
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+
+import partsparser
+import streaming
+
+ZERO = ord("0")
+NINE = ord("9")
+EMPTY = ord(".")
+GEAR = ord("*")
+NEWLINE = ord("\n")
+# Whitespace other modes strip from rows, see streaming.read_rows
+STRIPPED = np.frombuffer(b" \t\r\v\f", dtype=np.uint8)
+
+OFFSETS = [(dy, dx) for dy in (-1, 0, 1) for dx in (-1, 0, 1) if (dy, dx) != (0, 0)]
+
+
+def load(input: Iterable[str]) -> np.ndarray:
+    rows = [line.encode() for line in input]
+    width = len(rows[0]) if rows else 0
+    if any(len(row) != width for row in rows):
+        raise ValueError("schematic rows must all be the same width")
+    return np.frombuffer(b"".join(rows), dtype=np.uint8).reshape(len(rows), width)
+
+
+def load_file(path: Path) -> np.ndarray:
+    """The schematic in path, with rows read the same way as read_rows
+
+    Files of bare rows and newlines are reshaped in place, anything with
+    blank lines or stray whitespace (such as CRLF line endings) goes through
+    streaming.read_rows instead.
+
+    """
+    data = np.fromfile(path, dtype=np.uint8)
+    if len(data) and data[-1] != NEWLINE:
+        data = np.append(data, np.uint8(NEWLINE))
+    newlines = np.flatnonzero(data == NEWLINE)
+    if np.isin(data, STRIPPED).any() or np.any(np.diff(newlines, prepend=-1) == 1):
+        with path.open("r") as lines:
+            return load(streaming.read_rows(lines))
+    if len(newlines) == 0:
+        return np.zeros((0, 0), dtype=np.uint8)
+    width = int(newlines[0])
+    if len(data) != len(newlines) * (width + 1) or np.any(
+        np.diff(newlines) != width + 1
+    ):
+        raise ValueError(f"{path} rows must all be the same width")
+    return data.reshape(len(newlines), width + 1)[:, :width]
+
+
+def from_grid(grid: partsparser.Grid) -> np.ndarray:
+    return np.frombuffer(grid.chars, dtype=np.uint8).reshape(grid.height, grid.width)
+
+
+def label_numbers(chars: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Label each digit cell with its number's index (-1 elsewhere)
+
+    Returns the (height, width) int32 labels and the int64 value of each
+    number.
+
+    """
+    is_digit = (chars >= ZERO) & (chars <= NINE)
+    starts = is_digit.copy()
+    starts[:, 1:] &= ~is_digit[:, :-1]
+
+    flat_digit = is_digit.ravel()
+    labels = np.cumsum(starts.ravel(), dtype=np.int32) - 1
+    labels[~flat_digit] = partsparser.NO_NUMBER
+    labels = labels.reshape(chars.shape)
+
+    digits = chars.ravel()[flat_digit].astype(np.int64) - ZERO
+    number_starts = np.flatnonzero(starts.ravel()[flat_digit])
+    if len(number_starts) == 0:
+        return labels, np.zeros(0, dtype=np.int64)
+    number_ends = np.append(number_starts[1:], len(digits))
+    # Power of ten of each digit within its number
+    digit_labels = np.repeat(np.arange(len(number_starts)), number_ends - number_starts)
+    exponents = number_ends[digit_labels] - np.arange(len(digits)) - 1
+    values = np.add.reduceat(digits * 10**exponents, number_starts)
+    return labels, values
+
+
+def dilate(mask: np.ndarray) -> np.ndarray:
+    """Grow a 2D mask by one cell in all 8 directions"""
+    rows = mask.copy()
+    rows[1:, :] |= mask[:-1, :]
+    rows[:-1, :] |= mask[1:, :]
+    dilated = rows.copy()
+    dilated[:, 1:] |= rows[:, :-1]
+    dilated[:, :-1] |= rows[:, 1:]
+    return dilated
+
+
+def part_numbers(
+    chars: np.ndarray, labels: np.ndarray, values: np.ndarray
+) -> np.ndarray:
+    symbols = (chars != EMPTY) & ((chars < ZERO) | (chars > NINE))
+    touched = labels[dilate(symbols) & (labels != partsparser.NO_NUMBER)]
+    is_part = np.zeros(len(values), dtype=bool)
+    is_part[touched] = True
+    return values[is_part]
+
+
+def gear_neighbours(chars: np.ndarray, labels: np.ndarray) -> np.ndarray:
+    """(gears, 8) labels around each "*" cell, NO_NUMBER off the edge"""
+    height, width = chars.shape
+    gy, gx = np.nonzero(chars == GEAR)
+    neighbours = np.full((len(gy), len(OFFSETS)), partsparser.NO_NUMBER, np.int32)
+    for i, (dy, dx) in enumerate(OFFSETS):
+        y = gy + dy
+        x = gx + dx
+        inside = (y >= 0) & (y < height) & (x >= 0) & (x < width)
+        neighbours[inside, i] = labels[y[inside], x[inside]]
+    return neighbours
+
+
+def gear_ratios(
+    chars: np.ndarray, labels: np.ndarray, values: np.ndarray
+) -> np.ndarray:
+    neighbours = np.sort(gear_neighbours(chars, labels), axis=1)
+    distinct = neighbours != partsparser.NO_NUMBER
+    distinct[:, 1:] &= neighbours[:, 1:] != neighbours[:, :-1]
+    gears = distinct.sum(axis=1) == 2
+    neighbours = neighbours[gears]
+    distinct = distinct[gears]
+    # With the labels sorted the highest is last, the lowest is the first
+    # distinct one
+    high = neighbours[:, -1]
+    low = neighbours[np.arange(len(neighbours)), distinct.argmax(axis=1)]
+    return values[low] * values[high]
+
+
+EXAMPLE = """467..114..
+...*......
+..35..633.
+......#...
+617*......
+.....+.58.
+..592.....
+......755.
+...$.*....
+.664.598..
+""".splitlines()
+
+_chars = load(EXAMPLE)
+_labels, _values = label_numbers(_chars)
+assert _values.tolist() == [467, 114, 35, 633, 617, 58, 592, 755, 664, 598]
+assert part_numbers(_chars, _labels, _values).sum() == 4361
+assert gear_ratios(_chars, _labels, _values).tolist() == [16345, 451490]
@@ -1,39 +1,59 @@
 from pathlib import Path
+from typing import Annotated
 
 import typer
 import structlog
 
+import bands
+import bulk
 import partsparser
+import streaming
 
 APP = typer.Typer()
 
 LOG = structlog.get_logger()
 
 
+def gear_ratios(grid: partsparser.Grid) -> list[int]:
+    ratios: list[int] = []
+    for part in grid.parts_with_adjacent_count(2, symbols="*"):
+        n1, n2 = [number.value for number in grid.adjacent_numbers(part)]
+        ratio = n1 * n2
+        ratios.append(ratio)
+        LOG.info("gear", part=part, numbers=[n1, n2], ratio=ratio)
+    return ratios
+
+
 @APP.command()
-def main(input: Path, expected: int = -1, greater_than: int = -1):
-    grid = partsparser.parts_parser(
-        input=(line.strip() for line in input.open("r").readlines() if line.strip())
-    )
+def main(
+    input: Path,
+    expected: int = -1,
+    greater_than: int = -1,
+    bulk_: Annotated[bool, typer.Option("--bulk")] = False,
+    streaming_: Annotated[bool, typer.Option("--streaming")] = False,
+    parallel: bool = False,
+    processes: int = 0,
+):
+    """Sum the gear ratios in INPUT
 
-    ratios: list[int] = []
-    for _, _, square in grid.iterate_squares():
-        match square:
-            case partsparser.Part(symbol="*"):
-                numbers: set[int] = set()
-                for neighbour in grid.iterate_neighbours(square):
-                    match neighbour:
-                        case partsparser.Digit():
-                            numbers.add(neighbour.number.value)
-
-                ratio = None
-                numbers = list(numbers)
-                if len(numbers) == 2:
-                    n1 = numbers[0]
-                    n2 = numbers[1]
-                    ratio = n1 * n2
-                    ratios.append(ratio)
-                LOG.info("gear", part=square, numbers=numbers, ratio=ratio)
+    --bulk works on the schematic as NumPy arrays, for very large inputs.
+    --streaming reads INPUT a row at a time, for very tall inputs.
+    --parallel streams bands of rows across --processes (default all CPUs).
+
+    """
+    if parallel:
+        ratios = [bands.totals(input, processes=processes).gear_ratios]
+    elif streaming_:
+        ratios = list(streaming.gear_ratios(streaming.read_rows(input.open("r"))))
+    elif bulk_:
+        chars = bulk.load_file(input)
+        labels, values = bulk.label_numbers(chars)
+        ratios = bulk.gear_ratios(chars, labels, values).tolist()
+    else:
+        grid = partsparser.parts_parser(
+            input=(line.strip() for line in input.open("r").readlines() if line.strip())
+        )
+        ratios = gear_ratios(grid)
 
     total = sum(ratios)
     LOG.info("total", total=total)
@@ -1,24 +1,33 @@
 """Event driven solution :)
 
 """
-import collections
 
+import threading
 from pathlib import Path
 
+from rich.segment import Segment
+from rich.style import Style
+
 import partsparser
 
+MATCHED_STYLE = Style.parse("bold green")
+PROCESSING_STYLE = Style.parse("on blue")
 
-def get_markup(square: partsparser.Square) -> str:
-    char = "?"
+
+def get_char(square: partsparser.Square) -> str:
     match square:
         case partsparser.Empty():
-            char = "."
+            return "."
         case partsparser.Digit():
-            char = square.digit
+            return square.digit
         case partsparser.Part():
-            char = square.symbol
+            return square.symbol
         case _:
             raise NotImplementedError(square)
+
+
+def get_markup(square: partsparser.Square) -> str:
+    char = get_char(square)
     styles = []
     if square.matched:
         styles.append("bold green")
@@ -27,57 +36,80 @@ def get_markup(square: partsparser.Square) -> str:
     styles = " ".join(styles)
     opening = f"[{styles}]" if styles else ""
     closing = "[/]" if styles else ""
-    print((square.x, square.y, opening, closing))
     return f"{opening}{char}{closing}"
 
 
+def get_style(flags: int) -> Style | None:
+    style = None
+    if flags & partsparser.MATCHED:
+        style = MATCHED_STYLE
+    if flags & partsparser.PROCESSING:
+        style = style + PROCESSING_STYLE if style else PROCESSING_STYLE
+    return style
+
+
 class Solution:
     def __init__(self, input: Path):
         self.grid = partsparser.parts_parser(
             input=(line.strip() for line in input.open("r").readlines() if line.strip())
         )
-        self.ratios: list[int] = []
         self.total = 0
+        # Held while the stepper changes flags so readers see whole steps
+        self.lock = threading.Lock()
 
     def get_map_as_markup(self) -> str:
-        rows: dict[int, list[str]] = collections.defaultdict(list)
         lines = []
-        for x, y, square in self.grid.iterate_squares():
-            rows[y].append(get_markup(square))
-        for row in rows.values():
-            lines.append("".join(row))
+        for y in range(self.grid.height):
+            start = y * self.grid.width
+            lines.append(
+                "".join(
+                    get_markup(self.grid.square(index))
+                    for index in range(start, start + self.grid.width)
+                )
+            )
         return "\n".join(lines)
 
+    def get_row_segments(self, y: int) -> list[Segment]:
+        """Styled runs of a single row, for rendering a line at a time"""
+        start = y * self.grid.width
+        end = start + self.grid.width
+        with self.lock:
+            chars = self.grid.chars[start:end].decode()
+            flags = self.grid.flags[start:end]
+        segments: list[Segment] = []
+        run_start = 0
+        for x in range(1, len(flags) + 1):
+            if x == len(flags) or flags[x] != flags[run_start]:
+                segments.append(
+                    Segment(chars[run_start:x], get_style(flags[run_start]))
+                )
+                run_start = x
+        return segments
+
+    def take_dirty_rows(self) -> set[int]:
+        with self.lock:
+            dirty, self.grid.dirty = self.grid.dirty, set()
+        return {index // self.grid.width for index in dirty}
+
     def stepper(self):
-        ratios: list[int] = []
         previous_square: partsparser.Square | None = None
         for _, _, square in self.grid.iterate_squares():
-            square.processing = True
-            if previous_square is not None:
-                print((previous_square, square))
-                previous_square.processing = False
+            with self.lock:
+                square.processing = True
+                if previous_square is not None:
+                    previous_square.processing = False
             previous_square = square
 
             match square:
                 case partsparser.Part(symbol="*"):
-                    numbers: dict[tuple(int, int), partsparser.Number] = {}
-                    for neighbour in self.grid.iterate_neighbours(square):
-                        match neighbour:
-                            case partsparser.Digit():
-                                neighbour.number.processing = True
-                                number = neighbour.number
-                                numbers[(number.x, number.y)] = number
-
-                    ratio = None
+                    numbers = self.grid.adjacent_numbers(square)
+                    with self.lock:
+                        for number in numbers:
+                            number.processing = True
+                        if len(numbers) == 2:
+                            for number in numbers:
+                                number.matched = True
+                            square.matched = True
                     if len(numbers) == 2:
-                        for number in numbers.values():
-                            number.matched = True
-                        square.matched = True
-                        values = list(n.value for n in numbers.values())
-                        n1 = values[0]
-                        n2 = values[1]
-                        ratio = n1 * n2
-                        ratios.append(ratio)
-
-                    self.total = sum(ratios)
+                        self.total += numbers[0].value * numbers[1].value
                     yield self.total
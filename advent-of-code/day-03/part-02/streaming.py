@@ -0,0 +1,111 @@
+"""Streaming schematic solving
+
+Whether a number is a part number, or a "*" is a gear, only depends on the
+row it's on and the rows either side. So rows are read lazily and processed
+with a three row window, emitting part numbers and gear ratios for a row as
+soon as the row after it has been read. Memory is proportional to a row and
+rows can be any length, including differing from each other.
+
+"""
+
+import bisect
+import re
+from typing import Iterable, Iterator, Literal, NamedTuple, TextIO
+
+NUMBER_RE = re.compile(r"[0-9]+")
+SYMBOL_RE = re.compile(r"[^0-9.]")
+GEAR_RE = re.compile(r"\*")
+
+Kind = Literal["part", "gear"]
+
+
+class Row(NamedTuple):
+    text: str
+    # (start, end, value) with end exclusive, ordered by start
+    numbers: list[tuple[int, int, int]]
+    starts: list[int]
+
+
+class Found(NamedTuple):
+    kind: Kind
+    value: int
+
+
+def read_row(text: str) -> Row:
+    numbers = [(m.start(), m.end(), int(m.group())) for m in NUMBER_RE.finditer(text)]
+    return Row(text=text, numbers=numbers, starts=[n[0] for n in numbers])
+
+
+def windows(rows: Iterable[str]) -> Iterator[tuple[Row | None, Row, Row | None]]:
+    previous: Row | None = None
+    current: Row | None = None
+    for text in rows:
+        row = read_row(text)
+        if current is not None:
+            yield previous, current, row
+        previous, current = current, row
+    if current is not None:
+        yield previous, current, None
+
+
+def adjacent_numbers(row: Row, x: int) -> Iterator[int]:
+    """Values of numbers in row touching column x (including diagonally)"""
+    # Only the last two numbers starting at or before x + 1 can reach x
+    index = bisect.bisect_right(row.starts, x + 1)
+    for start, end, value in row.numbers[max(index - 2, 0) : index]:
+        if start - 1 <= x <= end:
+            yield value
+
+
+def scan(
+    rows: Iterable[str], halo_above: bool = False, halo_below: bool = False
+) -> Iterator[Found]:
+    """Find part numbers and gear ratios row by row
+
+    halo_above / halo_below treat the first / last row as context only, so
+    nothing on them is emitted.
+
+    """
+    for index, (previous, current, next) in enumerate(windows(rows)):
+        if (halo_above and index == 0) or (halo_below and next is None):
+            continue
+        window = [row for row in (previous, current, next) if row is not None]
+        for start, end, value in current.numbers:
+            low = max(start - 1, 0)
+            if any(SYMBOL_RE.search(row.text, low, end + 1) for row in window):
+                yield Found("part", value)
+        for match in GEAR_RE.finditer(current.text):
+            x = match.start()
+            numbers = [value for row in window for value in adjacent_numbers(row, x)]
+            if len(numbers) == 2:
+                yield Found("gear", numbers[0] * numbers[1])
+
+
+def part_numbers(rows: Iterable[str]) -> Iterator[int]:
+    return (found.value for found in scan(rows) if found.kind == "part")
+
+
+def gear_ratios(rows: Iterable[str]) -> Iterator[int]:
+    return (found.value for found in scan(rows) if found.kind == "gear")
+
+
+def read_rows(lines: TextIO) -> Iterator[str]:
+    return (line.strip() for line in lines if line.strip())
+
+
+EXAMPLE = """467..114..
+...*......
+..35..633.
+......#...
+617*......
+.....+.58.
+..592.....
+......755.
+...$.*....
+.664.598..
+""".splitlines()
+
+assert sum(part_numbers(EXAMPLE)) == 4361
+assert list(gear_ratios(EXAMPLE)) == [16345, 451490]
+# Rows don't need to be square, or even the same width
+assert list(part_numbers(["12*", "3", "..4#"])) == [12, 4]
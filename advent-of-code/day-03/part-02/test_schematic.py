@@ -0,0 +1,113 @@
+import random
+
+import numpy as np
+
+import bands
+import bulk
+import partsparser
+import streaming
+
+
+def random_schematic(height: int, width: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    cells = "......." + "0123456789" + "*#+$"
+    return ["".join(rng.choice(cells) for _ in range(width)) for _ in range(height)]
+
+
+def grid_part_numbers(grid: partsparser.Grid) -> list[int]:
+    return [number for number, is_part in grid.get_part_numbers() if is_part]
+
+
+def grid_gear_ratios(grid: partsparser.Grid) -> list[int]:
+    ratios = []
+    for part in grid.parts:
+        numbers = grid.adjacent_numbers(part)
+        if part.symbol == "*" and len(numbers) == 2:
+            ratios.append(numbers[0].value * numbers[1].value)
+    return ratios
+
+
+def test_bulk_matches_grid():
+    for seed in range(5):
+        rows = random_schematic(40, 40, seed)
+        grid = partsparser.parts_parser(rows)
+        chars = bulk.load(rows)
+        labels, values = bulk.label_numbers(chars)
+        assert values.tolist() == [number.value for number in grid.numbers]
+        assert np.array_equal(labels.ravel(), np.array(grid.labels))
+        assert bulk.part_numbers(chars, labels, values).tolist() == grid_part_numbers(
+            grid
+        )
+        assert sorted(bulk.gear_ratios(chars, labels, values).tolist()) == sorted(
+            grid_gear_ratios(grid)
+        )
+
+
+def test_streaming_matches_grid():
+    for seed in range(5):
+        rows = random_schematic(30, 50, seed)
+        grid = partsparser.parts_parser(rows)
+        assert list(streaming.part_numbers(rows)) == grid_part_numbers(grid)
+        assert sorted(streaming.gear_ratios(rows)) == sorted(grid_gear_ratios(grid))
+
+
+def test_bands_match_grid(tmp_path):
+    rows = random_schematic(60, 30, 0)
+    grid = partsparser.parts_parser(rows)
+    path = tmp_path / "schematic"
+    path.write_text("\n".join(rows) + "\n")
+    # Small chunks so most numbers and gears sit near a band edge
+    for chunk_size in [1, 31, 100, 1000]:
+        totals = bands.totals(path, processes=2, chunk_size=chunk_size)
+        assert totals.part_numbers == sum(grid_part_numbers(grid))
+        assert totals.gear_ratios == sum(grid_gear_ratios(grid))
+
+
+def test_adjacency_index_matches_scan():
+    for seed in range(5):
+        rows = random_schematic(30, 30, seed)
+        grid = partsparser.parts_parser(rows)
+        touching = {
+            part.index: {
+                grid.labels[i]
+                for i in grid.neighbour_indexes(part.index)
+                if grid.labels[i] != partsparser.NO_NUMBER
+            }
+            for part in grid.parts
+        }
+        for number in grid.numbers:
+            expected = [
+                part.index
+                for part in grid.parts
+                if number.label in touching[part.index]
+            ]
+            assert [part.index for part in grid.adjacent_parts(number)] == expected
+        for symbols in ["*", "#+", "*#+$"]:
+            expected = set().union(
+                *(touching[part.index] for part in grid.parts if part.symbol in symbols)
+            )
+            numbers = grid.numbers_adjacent_to(symbols)
+            assert [number.label for number in numbers] == sorted(expected)
+        for count in range(4):
+            expected = [
+                part.index
+                for part in grid.parts
+                if part.symbol == "*" and len(touching[part.index]) == count
+            ]
+            parts = grid.parts_with_adjacent_count(count, symbols="*")
+            assert [part.index for part in parts] == expected
+
+
+def test_bulk_load_file_reads_rows_like_streaming(tmp_path):
+    rows = random_schematic(6, 9, seed=3)
+    expected = bulk.load(rows)
+    for text in [
+        "\n".join(rows),
+        "\r\n".join(rows) + "\r\n",
+        "\n" + "\n\n".join(rows) + "\n\n",
+    ]:
+        path = tmp_path / "schematic"
+        path.write_bytes(text.encode())
+        assert np.array_equal(bulk.load_file(path), expected)
+        with path.open("r") as lines:
+            assert list(streaming.read_rows(lines)) == rows
@@ -2,25 +2,29 @@ from pathlib import Path
 
 import typer
 from solution import Solution
+from textual import work
 from textual.app import App, ComposeResult
 from textual.binding import Binding
-from textual.containers import ScrollableContainer
+from textual.geometry import Region, Size
 from textual.message import Message
 from textual.screen import Screen
-from textual.widget import Widget
-from textual.widgets import Footer, Header, Static
-
-from rich.text import Text
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+from textual.widgets import Footer, Header
+from textual.worker import get_current_worker
 
 CLI = typer.Typer()
 
+# Redraws are batched up and applied at most this many times a second
+FRAME_RATE = 30
+
+
+class Map(ScrollView):
+    """The schematic, rendered a line at a time
+
+    Stepping happens in a worker thread. A timer picks up the cells the
+    stepper changed since the last frame and only redraws their rows.
 
-class Map(Widget):
-    DEFAULT_CSS = """
-    Map > Static {
-        height: auto;
-        width: auto;
-    }
     """
 
     class TotalUpdated(Message):
@@ -30,43 +34,64 @@ class Map(Widget):
 
     def __init__(self, solution: Solution, *args, **kwargs):
         self.solution = solution
-        super().__init__(*args, **kwargs)
-
-    def compose(self) -> ComposeResult:
-        # line = []
-        # for i in range(20):
-        #     line.append(f".*..........[i]{i:02}[/]")
-        # line = "".join(line)
-        # print((len(line), line))
-        # lines = []
-        # for i in range(140):
-        #     lines.append(f"[b]{i:03}[/b]{line}")
-        # lines = "\n".join(lines)
-        # lines = open("input", "r").read()
-        # self.solution.grid.squares[0][1].processing = True
-        # self.solution.grid.squares[0][0].matched = True
         self.total = 0
-        lines = self.solution.get_map_as_markup()
-        self.map = Static(lines)
+        self.posted_total = 0
         self.stepper = self.solution.stepper()
-        yield self.map
+        self.strips: dict[int, Strip] = {}
+        self.running = False
+        super().__init__(*args, **kwargs)
+        grid = self.solution.grid
+        self.virtual_size = Size(grid.width, grid.height)
+
+    def on_mount(self) -> None:
+        self.set_interval(1 / FRAME_RATE, self.update_map)
+
+    def render_line(self, y: int) -> Strip:
+        scroll_x, scroll_y = self.scroll_offset
+        row = y + scroll_y
+        if row >= self.solution.grid.height:
+            return Strip.blank(self.size.width, self.rich_style)
+        strip = self.strips.get(row)
+        if strip is None:
+            strip = Strip(self.solution.get_row_segments(row), self.solution.grid.width)
+            self.strips[row] = strip
+        return strip.crop(scroll_x, scroll_x + self.size.width)
 
     def step(self) -> None:
+        if self.running:
+            return
         try:
             self.total = next(self.stepper)
         except StopIteration:
             pass
-        self.update_map()
-
-    def update_map(self) -> None:
-        self.map.update(Text.from_markup(self.solution.get_map_as_markup()))
-        self.post_message(self.TotalUpdated(self.total))
-        self.map.refresh()
 
     def run(self) -> None:
-        for total in self.stepper:
-            self.total = total
-        self.update_map()
+        if not self.running:
+            self.running = True
+            self.run_stepper()
+
+    @work(thread=True)
+    def run_stepper(self) -> None:
+        worker = get_current_worker()
+        try:
+            for total in self.stepper:
+                self.total = total
+                if worker.is_cancelled:
+                    break
+        finally:
+            self.running = False
+
+    def update_map(self) -> None:
+        rows = self.solution.take_dirty_rows()
+        if rows:
+            scroll_y = self.scroll_offset.y
+            for row in rows:
+                self.strips.pop(row, None)
+                if scroll_y <= row < scroll_y + self.size.height:
+                    self.refresh(Region(0, row - scroll_y, self.size.width, 1))
+        if self.total != self.posted_total:
+            self.posted_total = self.total
+            self.post_message(self.TotalUpdated(self.total))
 
 
 class MapScreen(Screen):
@@ -83,8 +108,7 @@ class MapScreen(Screen):
     def compose(self) -> ComposeResult:
         yield Header(show_clock=True)
         yield Footer()
-        with ScrollableContainer(id="map-scrollable-container"):
-            yield Map(self.solution, id="map")
+        yield Map(self.solution, id="map")
 
 
 @CLI.command()
@@ -107,11 +131,11 @@ def main(input: Path):
             self.sub_title = f"Total = {self.total}"
 
         def action_step(self) -> None:
-            map = self.query_one(Map)
+            map = self.screen.query_one(Map)
             map.step()
 
         def action_run(self) -> None:
-            map = self.query_one(Map)
+            map = self.screen.query_one(Map)
             map.run()
 
         def on_map_total_updated(self, message: Map.TotalUpdated):
@@ -1,9 +1,15 @@
 """Parses cards
 
+Numbers on a card are small, so as well as sets each side can be parsed as an
+integer bitmask with bit n set for number n (parse_masks), or a whole deck as
+NumPy arrays of 64 bit words (parse_deck). Matching numbers are then an AND
+and a popcount.
+
 """
 
 import typing
 
+import numpy as np
 import parsy
 
 EXAMPLE = """Card 1: 41 48 83 86 17 | 83 86  6 31 17  9 48 53
@@ -42,6 +48,87 @@ def parse(input: str) -> list[Card]:
     return ALL_CARDS.parse(input.strip())
 
 
+class MaskedCard(typing.TypedDict):
+    card: int
+    winning_mask: int
+    numbers_mask: int
+
+
+def to_mask(numbers: typing.Iterable[int]) -> int:
+    mask = 0
+    for number in numbers:
+        mask |= 1 << number
+    return mask
+
+
+MASK = (
+    parsy.regex(r"[0-9]+").map(int).sep_by(parsy.whitespace.at_least(n=1)).map(to_mask)
+)
+
+MASKED_ROW = parsy.seq(
+    card=CARD << parsy.string(":") << parsy.whitespace,
+    winning_mask=(MASK << parsy.whitespace << parsy.string("|") << parsy.whitespace),
+    numbers_mask=MASK,
+)
+
+ALL_MASKED_CARDS = MASKED_ROW.sep_by(parsy.string("\n"))
+
+
+def parse_masks(input: str) -> list[MaskedCard]:
+    return ALL_MASKED_CARDS.parse(input.strip())
+
+
+def count_matches(card: MaskedCard) -> int:
+    return (card["winning_mask"] & card["numbers_mask"]).bit_count()
+
+
+class Deck(typing.NamedTuple):
+    cards: np.ndarray
+    # (cards, words) uint64, bit n of word w is number 64 * w + n
+    winning: np.ndarray
+    numbers: np.ndarray
+
+    def match_counts(self) -> np.ndarray:
+        return popcount(self.winning & self.numbers).sum(axis=1)
+
+
+def popcount(words: np.ndarray) -> np.ndarray:
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words)
+    bits = np.unpackbits(words.view(np.uint8), axis=-1)
+    return bits.reshape(*words.shape, 64).sum(axis=-1)
+
+
+def to_words(masks: list[int], words: int) -> np.ndarray:
+    return np.array(
+        [
+            [(mask >> (64 * w)) & 0xFFFFFFFFFFFFFFFF for w in range(words)]
+            for mask in masks
+        ],
+        dtype=np.uint64,
+    ).reshape(len(masks), words)
+
+
+def parse_deck(input: str) -> Deck:
+    """Parse all the cards into bit arrays, skipping the per card dicts"""
+    cards: list[int] = []
+    winning: list[int] = []
+    numbers: list[int] = []
+    for line in input.strip().splitlines():
+        card, _, sides = line.partition(":")
+        left, _, right = sides.partition("|")
+        cards.append(int(card.removeprefix("Card")))
+        winning.append(to_mask(map(int, left.split())))
+        numbers.append(to_mask(map(int, right.split())))
+    bits = max((mask.bit_length() for mask in winning + numbers), default=0)
+    words = max(1, -(-bits // 64))
+    return Deck(
+        cards=np.array(cards, dtype=np.int64),
+        winning=to_words(winning, words),
+        numbers=to_words(numbers, words),
+    )
+
+
 assert parse(EXAMPLE) == [
     {
         "card": 1,
@@ -75,6 +162,9 @@ assert parse(EXAMPLE) == [
     },
 ]
 
+assert [count_matches(card) for card in parse_masks(EXAMPLE)] == [4, 2, 2, 1, 0, 0]
+assert parse_deck(EXAMPLE).match_counts().tolist() == [4, 2, 2, 1, 0, 0]
+
 if __name__ == "__main__":
     import sys
 
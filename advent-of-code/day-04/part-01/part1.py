@@ -1,6 +1,7 @@
 from pathlib import Path
 
 import cardparser
+import numpy as np
 import structlog
 import typer
 
@@ -8,21 +9,35 @@ APP = typer.Typer()
 LOG = structlog.get_logger()
 
 
+def deck_points(deck: cardparser.Deck) -> np.ndarray:
+    matches = deck.match_counts()
+    return np.where(matches > 0, np.left_shift(1, np.maximum(matches - 1, 0)), 0)
+
+
 @APP.command()
 def main(
     input: Path,
     expected: int = -1,
+    bitmask: bool = False,
 ):
-    parsed = cardparser.parse(input.open("r").read())
-    LOG.debug("parsed", parsed=parsed)
-
-    total = 0
-    for row in parsed:
-        winners = row["winning_numbers"].intersection(row["numbers"])
-        points = 1 if winners else 0
-        [points := points * 2 for _ in range(len(winners) - 1)]
-        LOG.info(row, winners=winners, points=points)
-        total += points
+    """Sum the scratchcard points in INPUT
+
+    --bitmask scores the whole deck at once from bit arrays.
+
+    """
+    if bitmask:
+        total = int(deck_points(cardparser.parse_deck(input.open("r").read())).sum())
+    else:
+        parsed = cardparser.parse(input.open("r").read())
+        LOG.debug("parsed", parsed=parsed)
+
+        total = 0
+        for row in parsed:
+            winners = row["winning_numbers"].intersection(row["numbers"])
+            points = 1 if winners else 0
+            [points := points * 2 for _ in range(len(winners) - 1)]
+            LOG.info(row, winners=winners, points=points)
+            total += points
     LOG.info("total", total=total)
     if expected > 0 and total != expected:
         LOG.warning("wrong expected total", expected=expected, total=total)
@@ -1,5 +1,6 @@
-import functools
+from collections import deque
 from pathlib import Path
+from typing import Iterable, Iterator
 
 import cardparser
 import structlog
@@ -9,38 +10,95 @@ APP = typer.Typer()
 LOG = structlog.get_logger()
 
 
-class Cards:
-    def __init__(self, cards: list[cardparser.Card]):
-        self.cards: dict[int, cardparser.Card] = {card["card"]: card for card in cards}
+def count_matches(card: cardparser.Card) -> int:
+    return len(card["winning_numbers"].intersection(card["numbers"]))
 
-    @functools.cache
-    def calculate_copies_won(self, card_number: int) -> int:
-        card: cardparser.Card = self.cards[card_number]
-        winners = card["winning_numbers"].intersection(card["numbers"])
-        won = len(winners)
-        for i in range(card_number + 1, card_number + 1 + len(winners)):
-            won += self.calculate_copies_won(i)
-        return won
+
+def copies_won(matches: list[int]) -> list[int]:
+    """Copies won by each card, including copies won by those copies
+
+    Works backwards from the last card, as a card's winnings only depend on
+    the cards after it. suffix[i] is the sum of won[i:], so the winnings of
+    the next n cards is a subtraction rather than a loop. Matches running
+    past the last card win nothing.
+
+    """
+    count = len(matches)
+    won = [0] * count
+    suffix = [0] * (count + 1)
+    for i in reversed(range(count)):
+        end = min(i + 1 + matches[i], count)
+        won[i] = end - (i + 1) + suffix[i + 1] - suffix[end]
+        suffix[i] = suffix[i + 1] + won[i]
+    return won
+
+
+def iter_instances(matches: Iterable[int]) -> Iterator[int]:
+    """How many of each card end up being held, reading cards in order
+
+    Each card adds its instances to the next n cards. Rather than touching
+    all n, that's recorded as a difference (+instances for the next card,
+    -instances n cards later), so only a window as long as the largest match
+    count is kept.
+
+    """
+    extra = 0
+    changes: deque[int] = deque()
+    for won in matches:
+        if changes:
+            extra += changes.popleft()
+        instances = 1 + extra
+        yield instances
+        if won:
+            while len(changes) <= won:
+                changes.append(0)
+            changes[0] += instances
+            changes[won] -= instances
+
+
+def iter_matches(lines: Iterable[str]) -> Iterator[int]:
+    for line in lines:
+        if line.strip():
+            yield cardparser.count_matches(cardparser.MASKED_ROW.parse(line.strip()))
 
 
 @APP.command()
 def main(
     input: Path,
     expected: int = -1,
+    streaming: bool = False,
+    bitmask: bool = False,
 ):
-    parsed = cardparser.parse(input.open("r").read())
-    LOG.debug("parsed", parsed=parsed)
-
-    cards = Cards(parsed)
-    total = 0
-    for card_number, card in cards.cards.items():
-        won_cards = cards.calculate_copies_won(card_number)
-        LOG.info("card", card=card, card_number=card_number, won_cards=won_cards)
-        total += won_cards + 1
+    """Count the scratchcards held in INPUT
+
+    --streaming reads INPUT a card at a time.
+    --bitmask counts matches for the whole deck at once from bit arrays.
+
+    """
+    if streaming:
+        total = sum(iter_instances(iter_matches(input.open("r"))))
+    elif bitmask:
+        deck = cardparser.parse_deck(input.open("r").read())
+        won = copies_won(deck.match_counts().tolist())
+        total = sum(won) + len(won)
+    else:
+        parsed = cardparser.parse(input.open("r").read())
+        LOG.debug("parsed", parsed=parsed)
+
+        won = copies_won([count_matches(card) for card in parsed])
+        total = 0
+        for card, won_cards in zip(parsed, won):
+            LOG.info("card", card=card, card_number=card["card"], won_cards=won_cards)
+            total += won_cards + 1
     LOG.info("total", total=total)
     if expected > 0 and total != expected:
         LOG.warning("wrong expected total", expected=expected, total=total)
 
 
+EXAMPLE_MATCHES = [4, 2, 2, 1, 0, 0]
+
+assert copies_won(EXAMPLE_MATCHES) == [14, 6, 3, 1, 0, 0]
+assert list(iter_instances(EXAMPLE_MATCHES)) == [1, 2, 4, 8, 14, 1]
+
 if __name__ == "__main__":
     APP()
@@ -2,6 +2,7 @@ import functools
 from pathlib import Path
 
 import almanacparser
+import piecewise
 import structlog
 import typer
 
@@ -16,6 +17,7 @@ class Almanac:
         # self.destination_lookup: dict[str, dict[int, int]] = {}
         for mapping in self.almanac["mappings"]:
             self.mappings[mapping["destination"]] = mapping["mappings"]
+        self.chain = piecewise.Chain(self.almanac["mappings"])
         #     self.destination_lookup.setdefault(mapping["destination"], {})
         #     destination_name = mapping["destination"]
         #     for mapping_table in mapping["mappings"]:
@@ -45,6 +47,15 @@ class Almanac:
                 return mapping["destination"] + (source_value - mapping["source"])
         return source_value
 
+    def compile(
+        self, source: str = "seed", destination: str = "location"
+    ) -> piecewise.Piecewise:
+        return self.chain.compile(source, destination)
+
+    def mapper(self, source: str, destination: str) -> piecewise.Piecewise:
+        """Cached mapping between any two categories on the chain"""
+        return self.chain.mapper(source, destination)
+
     def iterate_lookups(self, start: str):
         current = start
         while True:
@@ -60,7 +71,13 @@ class Almanac:
 def main(
     input: Path,
     expected: int = -1,
+    compiled: bool = False,
 ):
+    """Find the lowest location for any of the seeds in INPUT
+
+    --compiled looks seeds up in the whole chain compiled into a single table.
+
+    """
     parsed = almanacparser.parse(input.open("r").read())
     LOG.debug("parsed", parsed=parsed)
 
@@ -71,28 +88,32 @@ def main(
     )
 
     locations: list[int] = []
-    for seed in almanac.almanac["seeds"]:
-        LOG.info("seed", seed=seed)
-        current_result = seed
-        previous_mapping = "seed"
-        for next_mapping in almanac.iterate_lookups("seed"):
-            LOG.info(
-                "lookup",
-                mapping=next_mapping,
-                key=current_result,
-            )
-            current_result = almanac.lookup_next(next_mapping, current_result)
-            LOG.info(
-                "result",
-                seed=seed,
-                next_mapping=next_mapping,
-                previous_mapping=previous_mapping,
-                current_result=current_result,
-            )
-            previous_mapping = next_mapping
-
-        locations.append(current_result)
-        LOG.info("seed", seed=seed, location=current_result)
+    if compiled:
+        table = almanac.compile("seed", "location")
+        locations = [table.lookup(seed) for seed in almanac.almanac["seeds"]]
+    else:
+        for seed in almanac.almanac["seeds"]:
+            LOG.info("seed", seed=seed)
+            current_result = seed
+            previous_mapping = "seed"
+            for next_mapping in almanac.iterate_lookups("seed"):
+                LOG.info(
+                    "lookup",
+                    mapping=next_mapping,
+                    key=current_result,
+                )
+                current_result = almanac.lookup_next(next_mapping, current_result)
+                LOG.info(
+                    "result",
+                    seed=seed,
+                    next_mapping=next_mapping,
+                    previous_mapping=previous_mapping,
+                    current_result=current_result,
+                )
+                previous_mapping = next_mapping
+
+            locations.append(current_result)
+            LOG.info("seed", seed=seed, location=current_result)
 
     location = min(locations)
     LOG.info("location", location=location)
@@ -0,0 +1,86 @@
+"""Maps whole seed ranges through the almanac
+
+Rather than looking up every seed, each mapping is applied to half open
+[start, end) intervals. An interval is cut wherever a mapping table starts or
+stops, the cut pieces inside a table are shifted by that table's offset and
+everything else passes through unchanged. The work is proportional to the
+number of pieces, which stays small, rather than the number of seeds.
+
+"""
+
+from typing import Iterable
+
+import almanacparser
+
+Interval = tuple[int, int]
+
+
+def seed_intervals(almanac: almanacparser.Almanac) -> list[Interval]:
+    # Seed "end" is really the number of seeds in the range
+    return [
+        (seed["start"], seed["start"] + seed["end"])
+        for seed in almanac["seeds"]
+        if seed["end"] > 0
+    ]
+
+
+def map_interval(mapping: almanacparser.Mapping, interval: Interval) -> list[Interval]:
+    start, end = interval
+    mapped: list[Interval] = []
+    tables = sorted(mapping["mappings"], key=lambda table: table["source"])
+    for table in tables:
+        if start >= end:
+            break
+        table_start = table["source"]
+        table_end = table_start + table["count"]
+        if table_end <= start:
+            continue
+        if table_start >= end:
+            break
+        if start < table_start:
+            # The gap before this table maps to itself
+            mapped.append((start, table_start))
+            start = table_start
+        piece_end = min(end, table_end)
+        offset = table["destination"] - table_start
+        mapped.append((start + offset, piece_end + offset))
+        start = piece_end
+    if start < end:
+        mapped.append((start, end))
+    return mapped
+
+
+def merge(intervals: Iterable[Interval]) -> list[Interval]:
+    merged: list[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def propagate(
+    almanac: almanacparser.Almanac,
+    intervals: Iterable[Interval],
+    source: str = "seed",
+    destination: str = "location",
+) -> list[Interval]:
+    """Map intervals of source values to intervals of destination values"""
+    mappings = {mapping["source"]: mapping for mapping in almanac["mappings"]}
+    current = merge(intervals)
+    category = source
+    while category != destination:
+        mapping = mappings[category]
+        current = merge(
+            piece for interval in current for piece in map_interval(mapping, interval)
+        )
+        category = mapping["destination"]
+    return current
+
+
+def min_location(almanac: almanacparser.Almanac) -> int:
+    return propagate(almanac, seed_intervals(almanac))[0][0]
+
+
+assert min_location(almanacparser.parse(almanacparser.EXAMPLE)) == 46
@@ -0,0 +1,126 @@
+"""Numba compiled brute force lookups
+
+Numba can't compile the almanac's nested dicts, so the mapping stages are
+lowered into flat int64 arrays first. Every mapping table becomes a row of
+starts / ends / destinations, with the rows of each stage sorted by start and
+stored one stage after another. stage_bounds[i]:stage_bounds[i + 1] are the
+rows of stage i, in chain order.
+
+"""
+
+from typing import NamedTuple
+
+import almanacparser
+import numba
+import numpy as np
+
+
+class Tables(NamedTuple):
+    starts: np.ndarray
+    ends: np.ndarray
+    destinations: np.ndarray
+    stage_bounds: np.ndarray
+
+
+def lower(
+    almanac: almanacparser.Almanac, source: str = "seed", destination: str = "location"
+) -> Tables:
+    by_source = {mapping["source"]: mapping for mapping in almanac["mappings"]}
+    rows: list[tuple[int, int, int]] = []
+    stage_bounds = [0]
+    category = source
+    while category != destination:
+        mapping = by_source[category]
+        rows.extend(
+            sorted(
+                (
+                    table["source"],
+                    table["source"] + table["count"],
+                    table["destination"],
+                )
+                for table in mapping["mappings"]
+            )
+        )
+        stage_bounds.append(len(rows))
+        category = mapping["destination"]
+    columns = np.array(rows, dtype=np.int64).reshape(len(rows), 3)
+    return Tables(
+        starts=np.ascontiguousarray(columns[:, 0]),
+        ends=np.ascontiguousarray(columns[:, 1]),
+        destinations=np.ascontiguousarray(columns[:, 2]),
+        stage_bounds=np.array(stage_bounds, dtype=np.int64),
+    )
+
+
+# Seeds per block when running blocks in parallel
+BLOCK_SIZE = 1 << 20
+
+
+@numba.njit(cache=True)
+def find_row(value, starts, low, high):
+    """The last row in low:high starting at or before value, or low - 1"""
+    while low < high:
+        middle = (low + high) // 2
+        if starts[middle] <= value:
+            low = middle + 1
+        else:
+            high = middle
+    return low - 1
+
+
+@numba.njit(cache=True)
+def min_location(start, count, starts, ends, destinations, stage_bounds):
+    """Lowest location for seeds start to start + count
+
+    Consecutive seeds nearly always land on the same row as the seed before
+    at each stage, so that row is checked first and the binary search only
+    happens when it's left behind.
+
+    """
+    stages = len(stage_bounds) - 1
+    hints = stage_bounds[:-1] - 1
+    lowest = np.iinfo(np.int64).max
+    for seed in range(start, start + count):
+        value = seed
+        for stage in range(stages):
+            first = stage_bounds[stage]
+            stop = stage_bounds[stage + 1]
+            row = hints[stage]
+            if not (
+                (row < first or starts[row] <= value)
+                and (row + 1 >= stop or value < starts[row + 1])
+            ):
+                row = find_row(value, starts, first, stop)
+                hints[stage] = row
+            if row >= first and value < ends[row]:
+                value = destinations[row] + (value - starts[row])
+        lowest = min(lowest, value)
+    return lowest
+
+
+@numba.njit(cache=True, parallel=True)
+def min_location_parallel(start, count, starts, ends, destinations, stage_bounds):
+    blocks = (count + BLOCK_SIZE - 1) // BLOCK_SIZE
+    lowest = np.iinfo(np.int64).max
+    for block in numba.prange(blocks):
+        block_start = block * BLOCK_SIZE
+        block_count = min(BLOCK_SIZE, count - block_start)
+        lowest = min(
+            lowest,
+            min_location(
+                start + block_start,
+                block_count,
+                starts,
+                ends,
+                destinations,
+                stage_bounds,
+            ),
+        )
+    return lowest
+
+
+def range_min_location(
+    tables: Tables, start: int, count: int, parallel: bool = False
+) -> int:
+    kernel = min_location_parallel if parallel else min_location
+    return int(kernel(start, count, *tables))
@@ -1,8 +1,16 @@
 import functools
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
 from pathlib import Path
+from typing import Annotated
 
-# from numba import jit
 import almanacparser
+import intervals
+import kernel
+import numpy as np
+import piecewise
+import reverse
 import structlog
 import tqdm
 import typer
@@ -10,6 +18,19 @@ import typer
 APP = typer.Typer()
 LOG = structlog.get_logger()
 
+# Seeds looked up per lookup_many call when brute forcing
+CHUNK_SIZE = 1 << 22
+# Seeds handed to a worker at a time when brute forcing
+SHARD_SIZE = 1 << 25
+
+
+def shift(
+    breakpoints: np.ndarray, offsets: np.ndarray, values: np.ndarray
+) -> np.ndarray:
+    index = np.searchsorted(breakpoints, values, side="right")
+    index -= 1
+    return values + offsets[index]
+
 
 class Almanac:
     def __init__(self, almanac: almanacparser.Almanac):
@@ -24,21 +45,51 @@ class Almanac:
             self.mappings[destination] = mapping
             # for m in mappings:
             #     m["min"] = min(mv["source"] for mv in m)
+        self.chain = piecewise.Chain(self.almanac["mappings"])
+        # Per destination (breakpoints, offsets) for lookup_many, with the gaps
+        # between tables filled in as zero offsets
+        self.stage_tables: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        for destination, mapping_tables in self.mapping_tables.items():
+            stage = piecewise.Piecewise.from_tables(mapping_tables)
+            self.stage_tables[destination] = (
+                np.array(stage.starts, dtype=np.int64),
+                np.array(stage.offsets, dtype=np.int64),
+            )
 
     # @functools.cache
     def lookup_next(self, destination_name: str, source_value: int) -> int:
         if (
             source_value >= self.mappings[destination_name]["min_source"]
-            and source_value < self.mappings[destination_name]["max_source"]
+            and source_value <= self.mappings[destination_name]["max_source"]
         ):
             for mapping in self.mapping_tables[destination_name]:
                 if (
                     source_value >= mapping["min_source"]
-                    and source_value < mapping["max_source"]
+                    and source_value <= mapping["max_source"]
                 ):
                     return mapping["destination"] + (source_value - mapping["source"])
         return source_value
 
+    def lookup_many(self, destination_name: str, values: np.ndarray) -> np.ndarray:
+        """lookup_next for a whole array of source values at once"""
+        breakpoints, offsets = self.stage_tables[destination_name]
+        return shift(breakpoints, offsets, values)
+
+    def locations_many(self, seeds: np.ndarray) -> np.ndarray:
+        values = seeds
+        for next_mapping in self.iterate_lookups("seed"):
+            values = self.lookup_many(next_mapping, values)
+        return values
+
+    def compile(
+        self, source: str = "seed", destination: str = "location"
+    ) -> piecewise.Piecewise:
+        return self.chain.compile(source, destination)
+
+    def mapper(self, source: str, destination: str) -> piecewise.Piecewise:
+        """Cached mapping between any two categories on the chain"""
+        return self.chain.mapper(source, destination)
+
     @functools.cache
     def iterate_lookups(self, start: str) -> list[str]:
         current = start
@@ -52,11 +103,125 @@ class Almanac:
             current = next
 
 
+# (start, length) of each stage's breakpoints in the shared block, in chain
+# order. The stage's offsets follow straight after its breakpoints.
+Layout = list[tuple[int, int]]
+
+
+def share_tables(almanac: Almanac) -> tuple[shared_memory.SharedMemory, Layout]:
+    stages = [almanac.stage_tables[name] for name in almanac.iterate_lookups("seed")]
+    size = sum(2 * len(breakpoints) for breakpoints, _ in stages)
+    memory = shared_memory.SharedMemory(create=True, size=max(size, 1) * 8)
+    data = np.ndarray((size,), dtype=np.int64, buffer=memory.buf)
+    layout: Layout = []
+    position = 0
+    for breakpoints, offsets in stages:
+        count = len(breakpoints)
+        data[position : position + count] = breakpoints
+        data[position + count : position + 2 * count] = offsets
+        layout.append((position, count))
+        position += 2 * count
+    return memory, layout
+
+
+# Set in each worker process by attach_tables
+WORKER_MEMORY: shared_memory.SharedMemory | None = None
+WORKER_STAGES: list[tuple[np.ndarray, np.ndarray]] = []
+
+
+def attach_tables(name: str, layout: Layout) -> None:
+    global WORKER_MEMORY
+    WORKER_MEMORY = shared_memory.SharedMemory(name=name)
+    size = sum(2 * count for _, count in layout)
+    data = np.ndarray((size,), dtype=np.int64, buffer=WORKER_MEMORY.buf)
+    WORKER_STAGES[:] = [
+        (
+            data[position : position + count],
+            data[position + count : position + 2 * count],
+        )
+        for position, count in layout
+    ]
+
+
+def shard_min_location(start: int, end: int) -> int:
+    location = None
+    for chunk_start in range(start, end, CHUNK_SIZE):
+        values = np.arange(
+            chunk_start, min(chunk_start + CHUNK_SIZE, end), dtype=np.int64
+        )
+        for breakpoints, offsets in WORKER_STAGES:
+            values = shift(breakpoints, offsets, values)
+        chunk_location = int(values.min())
+        if location is None or chunk_location < location:
+            location = chunk_location
+    assert location is not None, "empty shard"
+    return location
+
+
+def brute_force_min_location(
+    almanac: Almanac, processes: int | None = None, shard_size: int = SHARD_SIZE
+) -> int:
+    """Look up every seed, spread over a process pool
+
+    The stage tables are put in shared memory once rather than being pickled
+    to every worker, and workers only send back the lowest location of each
+    shard.
+
+    """
+    processes = processes or os.cpu_count() or 1
+    shards = [
+        (start, min(start + shard_size, end))
+        for start, end in intervals.seed_intervals(almanac.almanac)
+        for start in range(start, end, shard_size)
+    ]
+    memory, layout = share_tables(almanac)
+    location: int | None = None
+    try:
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            initializer=attach_tables,
+            initargs=(memory.name, layout),
+        ) as executor:
+            futures = {
+                executor.submit(shard_min_location, start, end): end - start
+                for start, end in shards
+            }
+            with tqdm.tqdm(
+                desc="Seeds", total=sum(futures.values()), unit_scale=True
+            ) as progress:
+                for future in as_completed(futures):
+                    shard_location = future.result()
+                    if location is None or shard_location < location:
+                        location = shard_location
+                    progress.update(futures[future])
+    finally:
+        memory.close()
+        memory.unlink()
+    assert location is not None, "no seeds"
+    return location
+
+
 @APP.command()
 def main(
     input: Path,
     expected: int = -1,
+    brute_force: bool = False,
+    compiled: bool = False,
+    reverse_: Annotated[bool, typer.Option("--reverse")] = False,
+    numba: bool = False,
+    parallel: bool = False,
+    processes: int = 0,
 ):
+    """Find the lowest location for any of the seed ranges in INPUT
+
+    By default whole seed ranges are mapped as intervals. --brute-force looks
+    up every single seed instead, across --processes (default all CPUs), which
+    is slow but handy for cross checking. --compiled takes the minimum over
+    each range of the whole chain compiled into a single table. --reverse
+    walks up from location 0 mapping locations back to seeds. --numba looks
+    up every seed in a compiled kernel, spread over all cores with --parallel.
+
+    """
     parsed = almanacparser.parse(input.open("r").read())
     LOG.debug("parsed", parsed=parsed)
 
@@ -66,38 +231,29 @@ def main(
         lookups=list(almanac.iterate_lookups("seed")),
     )
 
-    locations: list[int] = []
-    for seed_range in tqdm.tqdm(almanac.almanac["seeds"], desc="Seed Ranges"):
-        seeds = (seed_range["start"] + i for i in range(seed_range["end"]))
-        total = seed_range["start"] + (seed_range["end"] - 1)
-        for i, seed in enumerate(tqdm.tqdm(seeds, desc="Seeds", total=total)):
-            if i >= 1e6:
-                return
-            # LOG.info("seed", seed=seed)
-            current_result: int = seed
-            # previous_mapping = "seed"
-            next_mapping: str
-            for next_mapping in almanac.iterate_lookups("seed"):
-                # LOG.info(
-                #     "lookup",
-                #     mapping=next_mapping,
-                #     key=current_result,
-                # )
-                # pass
-                current_result = almanac.lookup_next(next_mapping, current_result)
-                # LOG.info(
-                #     "result",
-                #     seed=seed,
-                #     next_mapping=next_mapping,
-                #     previous_mapping=previous_mapping,
-                #     current_result=current_result,
-                # )
-                # previous_mapping = next_mapping
-
-            locations.append(current_result)
-            # LOG.info("seed", seed=seed, location=current_result)
-
-    location = min(locations)
+    if brute_force:
+        location = brute_force_min_location(almanac, processes=processes)
+    elif numba:
+        tables = kernel.lower(parsed)
+        location = min(
+            kernel.range_min_location(tables, start, end - start, parallel=parallel)
+            for start, end in tqdm.tqdm(
+                intervals.seed_intervals(parsed), desc="Seed Ranges"
+            )
+        )
+    elif reverse_:
+        found = reverse.Reverse(parsed).min_location()
+        assert found is not None, "no location reaches a seed"
+        location = found
+    elif compiled:
+        table = almanac.compile("seed", "location")
+        location = min(
+            table.min_over(start, end)
+            for start, end in intervals.seed_intervals(parsed)
+        )
+    else:
+        location = intervals.min_location(parsed)
+
     LOG.info("location", location=location)
     if expected > 0 and location != expected:
         LOG.warning("wrong expected location", expected=expected, location=location)
@@ -0,0 +1,158 @@
+"""Compiles almanac mappings into piecewise linear functions
+
+A mapping shifts some ranges of values by a fixed offset and leaves the rest
+alone, so it's a sorted list of breakpoints with an offset after each one.
+Composing two of those gives another one, so a whole chain of mappings
+collapses into a single table and looking up a value is one bisect.
+
+Chain.mapper composes the stages between any two categories on the chain.
+Results are kept in a bounded LRU, and a mapping is built from the one ending
+a stage earlier, so related queries share most of the work.
+
+"""
+
+import bisect
+import functools
+from dataclasses import dataclass
+from typing import Iterable, Iterator, NamedTuple
+
+import almanacparser
+
+
+class Piece(NamedTuple):
+    start: int
+    # None for the last piece, which carries on forever
+    end: int | None
+    offset: int
+
+
+@dataclass(frozen=True)
+class Piecewise:
+    # starts[0] is always 0, offsets[i] applies from starts[i] to starts[i + 1]
+    starts: tuple[int, ...]
+    offsets: tuple[int, ...]
+
+    @classmethod
+    def from_tables(cls, tables: Iterable[almanacparser.MappingTable]) -> "Piecewise":
+        starts = [0]
+        offsets = [0]
+        for table in sorted(tables, key=lambda table: table["source"]):
+            start = table["source"]
+            end = start + table["count"]
+            offset = table["destination"] - start
+            if start == starts[-1]:
+                offsets[-1] = offset
+            else:
+                starts.append(start)
+                offsets.append(offset)
+            starts.append(end)
+            offsets.append(0)
+        return cls.merged(starts, offsets)
+
+    @classmethod
+    def merged(cls, starts: list[int], offsets: list[int]) -> "Piecewise":
+        """Drop breakpoints which don't change the offset"""
+        merged_starts = [starts[0]]
+        merged_offsets = [offsets[0]]
+        for start, offset in zip(starts[1:], offsets[1:]):
+            if offset != merged_offsets[-1]:
+                merged_starts.append(start)
+                merged_offsets.append(offset)
+        return cls(tuple(merged_starts), tuple(merged_offsets))
+
+    def pieces(self) -> Iterator[Piece]:
+        ends: list[int | None] = [*self.starts[1:], None]
+        for start, end, offset in zip(self.starts, ends, self.offsets):
+            yield Piece(start, end, offset)
+
+    def lookup(self, value: int) -> int:
+        return value + self.offsets[bisect.bisect_right(self.starts, value) - 1]
+
+    __call__ = lookup
+
+    def map_interval(self, start: int, end: int) -> Iterator[tuple[int, int]]:
+        """The values [start, end) map to, as shifted [start, end) pieces"""
+        index = bisect.bisect_right(self.starts, start) - 1
+        while start < end:
+            piece_end = end
+            if index + 1 < len(self.starts):
+                piece_end = min(end, self.starts[index + 1])
+            offset = self.offsets[index]
+            yield (start + offset, piece_end + offset)
+            start = piece_end
+            index += 1
+
+    def min_over(self, start: int, end: int) -> int:
+        return min(low for low, _ in self.map_interval(start, end))
+
+    def then(self, other: "Piecewise") -> "Piecewise":
+        """The function applying self and then other"""
+        starts: list[int] = []
+        offsets: list[int] = []
+        for start, end, offset in self.pieces():
+            # Split this piece wherever its image crosses a breakpoint of other
+            low = start + offset
+            index = bisect.bisect_right(other.starts, low) - 1
+            starts.append(start)
+            offsets.append(offset + other.offsets[index])
+            for breakpoint in other.starts[index + 1 :]:
+                if end is not None and breakpoint >= end + offset:
+                    break
+                starts.append(breakpoint - offset)
+                offsets.append(offset + other.offsets[index + 1])
+                index += 1
+        return self.merged(starts, offsets)
+
+
+IDENTITY = Piecewise((0,), (0,))
+
+# Composed mappings kept per chain
+MAPPER_CACHE_SIZE = 64
+
+
+class Chain:
+    """The mappings of an almanac, compiled between pairs of categories"""
+
+    def __init__(
+        self,
+        mappings: Iterable[almanacparser.Mapping],
+        cache_size: int = MAPPER_CACHE_SIZE,
+    ):
+        self.stages: dict[str, tuple[str, Piecewise]] = {
+            mapping["source"]: (
+                mapping["destination"],
+                Piecewise.from_tables(mapping["mappings"]),
+            )
+            for mapping in mappings
+        }
+        self.previous: dict[str, str] = {
+            destination: source for source, (destination, _) in self.stages.items()
+        }
+        # Wrapped per instance so the cache goes away with the chain
+        self.mapper = functools.lru_cache(maxsize=cache_size)(self.compose)
+
+    def compose(self, source: str, destination: str) -> Piecewise:
+        """The mapping from source to destination, uncached at this step"""
+        if source == destination:
+            return IDENTITY
+        if destination not in self.previous:
+            raise KeyError(f"no mappings from {source} to {destination}")
+        previous = self.previous[destination]
+        return self.mapper(source, previous).then(self.stages[previous][1])
+
+    def compile(self, source: str, destination: str) -> Piecewise:
+        return self.mapper(source, destination)
+
+
+assert (
+    Chain(almanacparser.parse(almanacparser.EXAMPLE)["mappings"])
+    .compile("seed", "location")
+    .lookup(79)
+    == 82
+)
+assert (
+    Chain(almanacparser.parse(almanacparser.EXAMPLE)["mappings"]).mapper(
+        "soil", "light"
+    )(81)
+    == 74
+)
@@ -0,0 +1,126 @@
+"""Searches backwards from locations to seeds
+
+The lowest location tends to be small, so rather than mapping every seed
+forwards this walks the locations upwards from 0 a chunk at a time. Each
+chunk is mapped back through the inverted mapping tables to the seed values
+which could reach it. The first chunk which touches a seed range is then
+narrowed down to the lowest location in it by bisection.
+
+Going backwards a value can come from two places: a table whose destination
+covers it, or itself when no table's source covers it. Both are tracked, so
+this doesn't rely on the mappings being one to one, and gives an answer found
+independently of the forward engines.
+
+"""
+
+import bisect
+
+import almanacparser
+import intervals
+from intervals import Interval
+
+CHUNK_SIZE = 1 << 20
+
+
+def invert(mapping: almanacparser.Mapping) -> almanacparser.Mapping:
+    """The mapping from destination back to source"""
+    tables: list[almanacparser.MappingTable] = [
+        {
+            "source": table["destination"],
+            "destination": table["source"],
+            "count": table["count"],
+            "min_source": table["destination"],
+            "max_source": table["destination"] + table["count"] - 1,
+        }
+        for table in mapping["mappings"]
+    ]
+    return {
+        "source": mapping["destination"],
+        "destination": mapping["source"],
+        "mappings": tables,
+        "min_source": min((table["min_source"] for table in tables), default=0),
+        "max_source": max((table["max_source"] for table in tables), default=0),
+    }
+
+
+class Reverse:
+    def __init__(
+        self,
+        almanac: almanacparser.Almanac,
+        source: str = "seed",
+        destination: str = "location",
+    ):
+        by_destination = {
+            mapping["destination"]: mapping for mapping in almanac["mappings"]
+        }
+        # (inverted mapping, original (start, end) source ranges in order)
+        self.stages: list[tuple[almanacparser.Mapping, list[Interval]]] = []
+        category = destination
+        while category != source:
+            mapping = by_destination[category]
+            sources = sorted(
+                (table["source"], table["source"] + table["count"])
+                for table in mapping["mappings"]
+            )
+            self.stages.append((invert(mapping), sources))
+            category = mapping["source"]
+        self.seeds = intervals.merge(intervals.seed_intervals(almanac))
+        self.seed_starts = [start for start, _ in self.seeds]
+        # Nothing maps above every table and seed, so no location can be there
+        self.limit = max(
+            [end for _, end in self.seeds]
+            + [
+                max(table["source"], table["destination"]) + table["count"]
+                for mapping in almanac["mappings"]
+                for table in mapping["mappings"]
+            ]
+        )
+
+    def preimage(self, interval: Interval) -> list[Interval]:
+        """The seed values which map into interval"""
+        current = [interval]
+        for inverted, sources in self.stages:
+            found: list[Interval] = []
+            for low, high in current:
+                for table in inverted["mappings"]:
+                    start = max(low, table["source"])
+                    end = min(high, table["source"] + table["count"])
+                    if start < end:
+                        offset = table["destination"] - table["source"]
+                        found.append((start + offset, end + offset))
+                # Values outside every source range map to themselves
+                position = low
+                for source_start, source_end in sources:
+                    if source_start >= high:
+                        break
+                    if position < source_start:
+                        found.append((position, source_start))
+                    position = max(position, source_end)
+                if position < high:
+                    found.append((position, high))
+            current = intervals.merge(found)
+        return current
+
+    def has_seed(self, interval: Interval) -> bool:
+        for start, end in self.preimage(interval):
+            index = bisect.bisect_right(self.seed_starts, end - 1) - 1
+            if index >= 0 and self.seeds[index][1] > start:
+                return True
+        return False
+
+    def min_location(self, chunk_size: int = CHUNK_SIZE) -> int | None:
+        for low in range(0, self.limit, chunk_size):
+            high = min(low + chunk_size, self.limit)
+            if self.has_seed((low, high)):
+                # Shrink to the first location which still reaches a seed
+                while high - low > 1:
+                    middle = (low + high) // 2
+                    if self.has_seed((low, middle)):
+                        high = middle
+                    else:
+                        low = middle
+                return low
+        return None
+
+
+assert Reverse(almanacparser.parse(almanacparser.EXAMPLE)).min_location(4) == 46
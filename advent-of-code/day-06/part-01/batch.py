@@ -0,0 +1,177 @@
+"""Counts wins for big tables of races at once
+
+A table is a text file with a time and a distance per line. It's read a
+chunk of rows at a time, and each chunk is solved with NumPy using the same
+method as part1.winning_holds: a float square root made exact with integer
+correction steps. Rows too big for that to be safe in int64 are solved one
+at a time with Python ints instead.
+
+"""
+
+import itertools
+import sys
+from pathlib import Path
+from typing import Annotated, Iterable, Iterator, Optional
+
+import numpy as np
+import structlog
+import typer
+
+import part1
+
+APP = typer.Typer()
+LOG = structlog.get_logger()
+
+CHUNK_ROWS = 1 << 18
+# Up to these, time * time - 4 * distance and the root checks fit in int64
+MAX_TIME = 1 << 31
+MAX_DISTANCE = 1 << 59
+
+
+def read_chunks(lines: Iterable[str], rows: int = CHUNK_ROWS) -> Iterator[list[str]]:
+    lines = (line for line in lines if line.strip())
+    while chunk := list(itertools.islice(lines, rows)):
+        yield chunk
+
+
+def parse_chunk(chunk: list[str]) -> tuple[list[int], list[int]]:
+    values = list(map(int, "".join(chunk).split()))
+    if len(values) != 2 * len(chunk):
+        raise ValueError("expected a time and a distance on every row")
+    return values[0::2], values[1::2]
+
+
+def isqrt_many(values: np.ndarray) -> np.ndarray:
+    roots = np.sqrt(values.astype(np.float64)).astype(np.int64)
+    # The float root can be out by one either way for large values
+    while (too_big := roots * roots > values).any():
+        roots -= too_big
+    while (too_small := (roots + 1) * (roots + 1) <= values).any():
+        roots += too_small
+    return roots
+
+
+def count_wins_many(times: np.ndarray, distances: np.ndarray) -> np.ndarray:
+    """count_wins for arrays of times and distances within the int64 limits"""
+    middle = times // 2
+    # Negative times have no hold times, see part1.winning_holds
+    winnable = (times >= 0) & (middle * (times - middle) > distances)
+    discriminant = np.where(winnable, times * times - 4 * distances, 0)
+    first = np.maximum((times - isqrt_many(discriminant)) // 2, 0)
+    first = np.where(winnable, first, middle)
+    while (short := winnable & (first * (times - first) <= distances)).any():
+        first += short
+    while (
+        long := winnable & (first > 0) & ((first - 1) * (times - first + 1) > distances)
+    ).any():
+        first -= long
+    return np.where(winnable, times - 2 * first + 1, 0)
+
+
+def count_chunk(times: list[int], distances: list[int]) -> list[int]:
+    try:
+        time_array = np.array(times, dtype=np.int64)
+        distance_array = np.array(distances, dtype=np.int64)
+    except OverflowError:
+        # Swap values beyond int64 for ones which fail the checks below
+        time_array = np.array(
+            [time if abs(time) <= MAX_TIME else MAX_TIME + 1 for time in times],
+            dtype=np.int64,
+        )
+        distance_array = np.array(
+            [
+                distance if abs(distance) <= MAX_DISTANCE else MAX_DISTANCE + 1
+                for distance in distances
+            ],
+            dtype=np.int64,
+        )
+    safe = (np.abs(time_array) <= MAX_TIME) & (np.abs(distance_array) <= MAX_DISTANCE)
+    counts = count_wins_many(
+        np.where(safe, time_array, 0), np.where(safe, distance_array, 0)
+    ).tolist()
+    for index in np.flatnonzero(~safe).tolist():
+        counts[index] = part1.count_wins(times[index], distances[index])
+    return counts
+
+
+def product(values: list[int], modulus: int = 0) -> int:
+    """Multiply in a balanced tree, which is much faster for huge products"""
+    if not values:
+        return 1
+    while len(values) > 1:
+        values = [
+            values[i] * values[i + 1] if i + 1 < len(values) else values[i]
+            for i in range(0, len(values), 2)
+        ]
+        if modulus:
+            values = [value % modulus for value in values]
+    return values[0] % modulus if modulus else values[0]
+
+
+def solve(
+    lines: Iterable[str], rows: int = CHUNK_ROWS, modulus: int = 0
+) -> Iterator[tuple[list[int], int]]:
+    """Per chunk, the win counts and the running product of every count"""
+    total = 1
+    for chunk in read_chunks(lines, rows):
+        counts = count_chunk(*parse_chunk(chunk))
+        if total and 0 in counts:
+            total = 0
+        elif total:
+            total *= product(counts, modulus)
+            if modulus:
+                total %= modulus
+        yield counts, total
+
+
+assert count_chunk([7, 15, 30, 71530], [9, 40, 200, 940200]) == [4, 8, 9, 71503]
+assert count_chunk([-3, -4, 0, -(1 << 70)], [0, -100, -1, 0]) == [0, 0, 1, 0]
+
+
+assert count_chunk([7, 1 << 70], [9, 1 << 138]) == [
+    4,
+    part1.count_wins(1 << 70, 1 << 138),
+]
+
+
+@APP.command()
+def main(
+    table: Path,
+    counts: Annotated[Optional[Path], typer.Option()] = None,
+    modulus: int = 0,
+    chunk_rows: int = CHUNK_ROWS,
+    expected: int = -1,
+):
+    """Multiply together the ways to win every race in TABLE
+
+    TABLE has a time and a distance on each line. Win counts for each row are
+    written to --counts (- for stdout) as they're found. With --modulus the
+    product is kept modulo that, as exact products of millions of rows run to
+    millions of digits.
+
+    """
+    rows = 0
+    total = 1
+    with table.open("r") as lines:
+        output = None
+        if counts is not None:
+            output = sys.stdout if str(counts) == "-" else counts.open("w")
+        try:
+            for chunk_counts, total in solve(lines, chunk_rows, modulus):
+                rows += len(chunk_counts)
+                if output is not None:
+                    output.writelines(f"{count}\n" for count in chunk_counts)
+        finally:
+            if output is not None and output is not sys.stdout:
+                output.close()
+    if total.bit_length() > 10_000:
+        # Too long to usefully log, and beyond str()'s default digit limit
+        LOG.info("total", rows=rows, total_bits=total.bit_length())
+    else:
+        LOG.info("total", rows=rows, total=total)
+    if expected > 0 and total != expected:
+        LOG.warning("wrong expected total", expected=expected, total=total)
+
+
+if __name__ == "__main__":
+    APP()
@@ -0,0 +1,197 @@
+"""Benchmarks the Go brute force against the Python closed form solver
+
+Runs both on the shared input.json and on synthetic inputs with longer and
+longer races, recording wall time, peak RSS and the answer of each run, then
+prints a comparison table. Peak RSS is sampled from /proc while each run is
+going, so it's only as fine grained as POLL_INTERVAL.
+
+    python bench.py --scales 1000000,100000000 --repeat 3
+
+The Go solver is part-02/main.go, which takes the same JSON as part 1 but
+only logs every 10 million holds, built once with go build.
+
+"""
+
+import json
+import os
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+import structlog
+import typer
+from rich.console import Console
+from rich.table import Table
+
+APP = typer.Typer()
+LOG = structlog.get_logger()
+
+HERE = Path(__file__).resolve().parent
+GO_SOURCE = HERE.parent / "part-02"
+GO_ANSWER_RE = re.compile(rb"^solution: (\d+)$", re.MULTILINE)
+PYTHON_ANSWER_RE = re.compile(rb"total=(\d+)")
+# Also the resolution of the timings and RSS samples
+POLL_INTERVAL = 0.001
+
+
+class Run(NamedTuple):
+    seconds: float
+    peak_rss_kb: int
+    answer: int | None
+
+
+def build_go(output: Path) -> Path:
+    """Build the Go solver into output
+
+    The repo's go.work only lists day-08, so it's switched off to build the
+    day-06 module on its own.
+
+    """
+    go = shutil.which("go") or "/usr/local/go/bin/go"
+    subprocess.run(
+        [go, "build", "-o", str(output), "."],
+        cwd=GO_SOURCE,
+        env={**os.environ, "GOWORK": "off"},
+        check=True,
+    )
+    return output
+
+
+def peak_rss_kb(pid: int) -> int:
+    """The process's VmHWM, or 0 once it's gone
+
+    wait4's ru_maxrss can't be used: Linux carries the high water mark of the
+    process doing the fork over the exec, so every run would report at least
+    this script's own RSS.
+
+    """
+    try:
+        status = Path(f"/proc/{pid}/status").read_text()
+    except OSError:
+        return 0
+    match = re.search(r"^VmHWM:\s+(\d+) kB$", status, re.MULTILINE)
+    return int(match.group(1)) if match else 0
+
+
+def run(command: list[str], answer_re: re.Pattern[bytes], timeout: float) -> Run:
+    """Run command, timing it and sampling its peak RSS until it exits"""
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        command, cwd=HERE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+    )
+    assert process.stdout is not None
+    os.set_blocking(process.stdout.fileno(), False)
+    output = b""
+    peak = 0
+    deadline = start + timeout
+    while True:
+        # Sample before reaping, after which /proc/<pid> is gone
+        peak = max(peak, peak_rss_kb(process.pid))
+        output += process.stdout.read() or b""
+        if process.poll() is not None:
+            break
+        if time.perf_counter() > deadline:
+            process.kill()
+            process.wait()
+            return Run(float("inf"), peak, None)
+        time.sleep(POLL_INTERVAL)
+    seconds = time.perf_counter() - start
+    output += process.stdout.read() or b""
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, command, output)
+    match = answer_re.search(output)
+    return Run(seconds, peak, int(match.group(1)) if match else None)
+
+
+def best_of(
+    command: list[str], answer_re: re.Pattern[bytes], repeat: int, timeout: float
+) -> Run:
+    """The fastest time, and the highest RSS sampled over every run"""
+    runs = [run(command, answer_re, timeout) for _ in range(repeat)]
+    fastest = min(runs, key=lambda r: r.seconds)
+    return fastest._replace(peak_rss_kb=max(r.peak_rss_kb for r in runs))
+
+
+def generate(path: Path, races: int, time_scale: int, seed: int) -> None:
+    """Races of about time_scale milliseconds with beatable records"""
+    rng = random.Random(seed)
+    data = []
+    for _ in range(races):
+        race_time = rng.randint(time_scale // 2, time_scale)
+        best = (race_time // 2) * (race_time - race_time // 2)
+        data.append({"time": race_time, "distance": rng.randint(best // 2, best - 1)})
+    path.write_text(json.dumps(data))
+
+
+@APP.command()
+def main(
+    scales: str = "1000000,100000000,3000000000",
+    races: int = 1,
+    repeat: int = 3,
+    timeout: float = 300.0,
+    seed: int = 0,
+):
+    """Compare the Go and Python day 6 solvers
+
+    --scales is a comma separated list of race lengths for synthetic inputs,
+    each with --races races. main.go's ints overflow on races much over 6
+    billion long. Runs over --timeout seconds are abandoned.
+
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        go_binary = build_go(tmp_path / "part_02")
+
+        inputs: list[tuple[str, Path]] = [("input.json", HERE / "input.json")]
+        for scale in [int(scale) for scale in scales.split(",") if scale]:
+            path = tmp_path / f"scale-{scale}.json"
+            generate(path, races, scale, seed)
+            inputs.append((f"{races} x ~{scale:,}", path))
+
+        table = Table(title="Day 6: Go brute force vs Python closed form")
+        for column in ["input", "engine", "seconds", "peak RSS MB", "answer"]:
+            table.add_column(column, justify="left" if column == "input" else "right")
+        table.add_column("vs go", justify="right")
+
+        for name, path in inputs:
+            engines = {
+                "go": best_of(
+                    [str(go_binary), "-input", str(path)],
+                    GO_ANSWER_RE,
+                    repeat,
+                    timeout,
+                ),
+                "python": best_of(
+                    [sys.executable, str(HERE / "part1.py"), str(path)],
+                    PYTHON_ANSWER_RE,
+                    repeat,
+                    timeout,
+                ),
+            }
+            answers = {result.answer for result in engines.values()} - {None}
+            if len(answers) > 1:
+                LOG.warning("answers differ", input=name, engines=engines)
+            for engine, result in engines.items():
+                LOG.info("run", input=name, engine=engine, **result._asdict())
+                relative = result.seconds / engines["go"].seconds
+                table.add_row(
+                    name,
+                    engine,
+                    "timeout" if result.answer is None else f"{result.seconds:.3f}",
+                    # Runs can finish before they're sampled at all
+                    f"{result.peak_rss_kb / 1024:.1f}" if result.peak_rss_kb else "-",
+                    "-" if result.answer is None else str(result.answer),
+                    f"{relative:.2f}x",
+                )
+
+        Console().print(table)
+
+
+if __name__ == "__main__":
+    APP()
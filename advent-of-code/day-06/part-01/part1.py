@@ -0,0 +1,97 @@
+"""Counts the ways to win boat races
+
+Holding the button for h of a race's T milliseconds travels h * (T - h), so
+the winning hold times are the whole numbers strictly between the roots of
+h * (T - h) = D. Those come from math.isqrt, corrected to the exact boundary
+with integer arithmetic, so a race costs the same however long it is.
+
+"""
+
+import json
+import math
+from pathlib import Path
+from typing import TypedDict
+
+import structlog
+import typer
+
+APP = typer.Typer()
+LOG = structlog.get_logger()
+
+
+class Race(TypedDict):
+    time: int
+    distance: int
+
+
+def winning_holds(time: int, distance: int) -> tuple[int, int] | None:
+    """The shortest and longest hold times beating distance, if any"""
+    if time < 0:
+        # No hold times at all, like main.go's loop up to time
+        return None
+    middle = time // 2
+    if middle * (time - middle) <= distance:
+        return None
+    # isqrt rounds down, so this can be a step or so either side of the root
+    first = max((time - math.isqrt(time * time - 4 * distance)) // 2, 0)
+    while first * (time - first) <= distance:
+        first += 1
+    while first > 0 and (first - 1) * (time - first + 1) > distance:
+        first -= 1
+    return first, time - first
+
+
+def count_wins(time: int, distance: int, start_at: int = 0) -> int:
+    """How many hold times from start_at up to time beat distance"""
+    holds = winning_holds(time, distance)
+    if holds is None:
+        return 0
+    first, last = holds
+    return max(last - max(first, start_at) + 1, 0)
+
+
+def solution(races: list[Race], start_at: int = 0) -> int:
+    total = 1
+    for race in races:
+        total *= count_wins(race["time"], race["distance"], start_at)
+    return total
+
+
+def read_races(input: Path) -> list[Race]:
+    return json.loads(input.read_text())
+
+
+@APP.command()
+def main(
+    input: Path,
+    expected: int = -1,
+    startat: int = 0,
+):
+    """Multiply together the number of ways to win each race in INPUT
+
+    INPUT is the same JSON as main.go reads. --startat only counts hold times
+    from that value on, like main.go -startat.
+
+    """
+    races = read_races(input)
+    for race in races:
+        LOG.info("race", race=race, wins=count_wins(**race, start_at=startat))
+    total = solution(races, startat)
+    LOG.info("total", total=total)
+    if expected > 0 and total != expected:
+        LOG.warning("wrong expected total", expected=expected, total=total)
+
+
+EXAMPLE: list[Race] = [
+    {"time": 7, "distance": 9},
+    {"time": 15, "distance": 40},
+    {"time": 30, "distance": 200},
+]
+
+assert [count_wins(**race) for race in EXAMPLE] == [4, 8, 9]
+assert count_wins(71530, 940200) == 71503
+assert count_wins(30, 200, start_at=15) == 5
+assert count_wins(-3, 0) == 0
+
+if __name__ == "__main__":
+    APP()